@@ -0,0 +1,57 @@
+"""
+Microbenchmark: assistant content extraction.
+
+Compares the legacy str() -> ast.literal_eval round trip against the
+structured extractor on assistant turns carrying large tool inputs.
+
+    python benchmarks/bench_parse_content.py
+"""
+
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from server import extract_assistant_content, parse_assistant_content  # noqa: E402
+
+
+def make_content(input_kb: int) -> list[dict]:
+    body = "x = compute(value)\n" * (input_kb * 1024 // 19)
+    return [
+        {"type": "text", "text": "Updating the parser and rewriting the module."},
+        {
+            "type": "tool_use",
+            "id": "toolu_01",
+            "name": "Write",
+            "input": {"file_path": "/src/module.py", "content": body},
+        },
+        {
+            "type": "tool_use",
+            "id": "toolu_02",
+            "name": "Edit",
+            "input": {"file_path": "/src/other.py", "old_string": body[:2048], "new_string": body[:4096]},
+        },
+    ]
+
+
+def main():
+    print(f"{'tool input':>10}  {'legacy':>12}  {'structured':>12}  {'speedup':>8}")
+    for kb in (1, 16, 128, 512):
+        content = make_content(kb)
+        assert parse_assistant_content(str(content)) == extract_assistant_content(content)
+        number = max(3, 2000 // kb)
+        legacy = min(timeit.repeat(
+            lambda: parse_assistant_content(str(content)), number=number, repeat=3
+        )) / number
+        structured = min(timeit.repeat(
+            lambda: extract_assistant_content(content), number=number, repeat=3
+        )) / number
+        print(
+            f"{kb:>8}KB  {legacy * 1e6:>10.1f}us  {structured * 1e6:>10.2f}us"
+            f"  {legacy / structured:>7.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
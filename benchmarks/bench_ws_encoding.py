@@ -0,0 +1,120 @@
+"""
+Microbenchmark: /ws snapshot encoding.
+
+Compares, for one large snapshot sent to many clients, the old per-client
+stdlib encoding against a payload serialized once per tick (stdlib json,
+orjson, MessagePack), and what permessage-deflate adds per client.
+
+    python benchmarks/bench_ws_encoding.py [projects] [sessions] [clients]
+"""
+
+import json
+import sys
+import time
+import zlib
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from server import _dumps, _encode, msgpack, orjson  # noqa: E402
+
+
+def make_snapshot(projects: int, sessions: int) -> dict:
+    text = "重构解析器并补充测试 — refactor the parser and add coverage for edge cases. " * 3
+    return {
+        "type": "snapshot",
+        "v": 1,
+        "data": {
+            "timestamp": "2026-10-17T10:00:00+00:00",
+            "summary": {"totalProjects": projects, "activeProjects": projects // 2,
+                        "totalActiveSessions": projects * sessions // 2,
+                        "totalRecentSessions": projects * sessions // 2},
+            "projects": [
+                {
+                    "name": f"project-{p}", "path": f"/home/dev/src/project-{p}",
+                    "dirName": f"-home-dev-src-project-{p}", "totalSessions": sessions * 20,
+                    "activeSessions": sessions // 2, "recentSessions": sessions // 2,
+                    "idleSessions": sessions * 19, "hasActive": True, "hasRecent": True,
+                    "latestMtime": 1792200000.0 + p,
+                    "sessions": [
+                        {
+                            "sessionId": f"{p:04d}{s:04d}", "fullId": f"{p:04d}{s:04d}-aaaa-bbbb-cccc-dddddddddddd",
+                            "status": "active" if s % 2 else "recent", "age": 12.5 * s,
+                            "mtime": 1792200000.0 - s, "fileSize": 184_000 + s,
+                            "summary": text[:80], "firstPrompt": text[:120], "messageCount": 40 + s,
+                            "created": "2026-10-17T09:00:00Z", "modified": "2026-10-17T09:59:00Z",
+                            "gitBranch": "main", "isSidechain": False,
+                            "live": {
+                                "model": "claude-opus-4-6", "slug": "quiet-river", "version": "2.1.0",
+                                "cwd": f"/home/dev/src/project-{p}", "lastUserMessage": text[:200],
+                                "lastTool": "Edit", "inputTokens": 120_000 + s, "outputTokens": 8_000 + s,
+                                "cacheRead": 900_000, "lastTimestamp": "2026-10-17T09:59:00Z",
+                            },
+                        }
+                        for s in range(sessions)
+                    ],
+                }
+                for p in range(projects)
+            ],
+            "teams": [
+                {
+                    "name": f"team-{t}",
+                    "members": [
+                        {"name": f"agent-{m}", "agentType": "general", "cwd": "/home/dev/src/project-0",
+                         "sessionReasoning": [{"text": text, "tools": ["Read", "Edit"]}] * 6}
+                        for m in range(6)
+                    ],
+                    "messageFlow": [{"from": "lead", "to": f"agent-{i % 6}", "text": text[:160]} for i in range(20)],
+                }
+                for t in range(3)
+            ],
+            "history": [{"display": text[:100], "project": "/home/dev/src/project-0"}] * 15,
+        },
+    }
+
+
+def timed(fn, repeat: int = 5):
+    best, out = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, out
+
+
+def deflate(payload: bytes) -> bytes:
+    # permessage-deflate: raw deflate, one compressor per connection
+    comp = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+    return comp.compress(payload) + comp.flush(zlib.Z_SYNC_FLUSH)
+
+
+def main():
+    args = [int(a) for a in sys.argv[1:4]]
+    projects, sessions, clients = args + [60, 40, 20][len(args):]
+    msg = make_snapshot(projects, sessions)
+
+    stdlib = lambda: json.dumps(msg, separators=(",", ":"), ensure_ascii=False)  # noqa: E731
+    rows = []
+    t, out = timed(stdlib)
+    rows.append(("stdlib json, per client (before)", len(out.encode()), t * clients, t))
+    rows.append(("stdlib json, once per tick", len(out.encode()), t, t / clients))
+    if orjson is not None:
+        t, out = timed(lambda: _dumps(msg))
+        rows.append(("orjson, once per tick", len(out.encode()), t, t / clients))
+    text = _dumps(msg).encode()
+    t_deflate, out = timed(lambda: deflate(text))
+    t_text, _ = timed(lambda: _dumps(msg))
+    rows.append(("json + permessage-deflate", len(out), t_text + t_deflate * clients,
+                 t_text / clients + t_deflate))
+    if msgpack is not None:
+        t, out = timed(lambda: _encode(msg, "msgpack"))
+        rows.append(("msgpack, once per tick", len(out), t, t / clients))
+
+    print(f"  snapshot: {projects} projects x {sessions} sessions, {clients} clients")
+    print(f"  {'encoding':<34}{'bytes/client':>14}{'ms/tick':>10}{'ms/client':>11}")
+    for name, size, total, per in rows:
+        print(f"  {name:<34}{size:>14,}{total * 1e3:>10.2f}{per * 1e3:>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Stress check: concurrent inbox writers.
+
+Several processes, each with several threads, append messages to the same
+inbox through append_inbox_message, while one agent-style process appends
+with a plain read/replace and no lock, the way agents write their inboxes.
+Every server message must end up in the final file exactly once, and the
+file must stay valid JSON throughout. Agent messages lost to the remaining
+check-then-replace window are reported but do not fail the run.
+
+    python benchmarks/stress_inbox.py [processes] [threads] [messages]
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from multiprocessing import Process
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from server import append_inbox_message  # noqa: E402
+
+
+def writer(inbox: Path, proc: int, threads: int, messages: int):
+    def run(thread: int):
+        for i in range(messages):
+            append_inbox_message(inbox, {
+                "from": f"p{proc}-t{thread}",
+                "text": f"message {i}",
+                "timestamp": f"{proc}:{thread}:{i}",
+            })
+
+    pool = [threading.Thread(target=run, args=(t,)) for t in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+
+
+def agent(inbox: Path, messages: int):
+    for i in range(messages):
+        try:
+            data = json.loads(inbox.read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            data = []
+        data.append({"from": "agent", "text": f"message {i}", "timestamp": f"agent:{i}"})
+        tmp = inbox.with_name(f".{inbox.name}.agent.tmp")
+        tmp.write_text(json.dumps(data), encoding="utf-8")
+        os.replace(tmp, inbox)
+        time.sleep(0.002)
+
+
+def reader(inbox: Path, stop: threading.Event, torn: list):
+    while not stop.is_set():
+        try:
+            json.loads(inbox.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            pass
+        except json.JSONDecodeError:
+            torn.append(1)
+
+
+def main():
+    args = [int(a) for a in sys.argv[1:4]]
+    procs, threads, messages = args + [4, 4, 50][len(args):]
+    with tempfile.TemporaryDirectory() as tmp:
+        inbox = Path(tmp) / "inboxes" / "agent.json"
+        inbox.parent.mkdir()
+        stop, torn = threading.Event(), []
+        watcher = threading.Thread(target=reader, args=(inbox, stop, torn))
+        watcher.start()
+
+        start = time.perf_counter()
+        workers = [Process(target=writer, args=(inbox, p, threads, messages)) for p in range(procs)]
+        workers.append(Process(target=agent, args=(inbox, messages * threads)))
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+        elapsed = time.perf_counter() - start
+        stop.set()
+        watcher.join()
+
+        data = json.loads(inbox.read_text(encoding="utf-8"))
+        expected = {f"{p}:{t}:{i}" for p in range(procs) for t in range(threads) for i in range(messages)}
+        got = [m["timestamp"] for m in data if m["from"] != "agent"]
+        lost = len(expected - set(got))
+        agent_lost = messages * threads - len({m["timestamp"] for m in data if m["from"] == "agent"})
+        dupes = len(got) - len(set(got))
+        leftovers = [f.name for f in inbox.parent.iterdir() if f.name != inbox.name]
+
+        print(f"  writers      {procs} processes x {threads} threads x {messages} messages")
+        print(f"  written      {len(got)} / {len(expected)} in {elapsed:.2f}s")
+        print(f"  agent        {messages * threads} unlocked messages")
+        print(f"  lost         {lost}")
+        print(f"  agent lost   {agent_lost}")
+        print(f"  duplicated   {dupes}")
+        print(f"  torn reads   {len(torn)}")
+        print(f"  temp files   {len(leftovers)}")
+        if lost or dupes or torn or leftovers:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
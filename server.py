@@ -6,17 +6,59 @@ agent topology, team interactions, skill usage, and sub-conversations.
 
 import ast
 import asyncio
+import atexit
+import base64
+import gzip
+import hashlib
+import io
 import json
+import marshal
+import math
+import multiprocessing
+import os
 import re
 import shutil
+import sqlite3
+import threading
 import time
+import traceback
 import uuid
+import zlib
+from bisect import bisect_left, bisect_right, insort
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from contextlib import contextmanager
 from datetime import datetime, timezone
 from pathlib import Path
 
 from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
 from fastapi.responses import FileResponse, PlainTextResponse, RedirectResponse
 
+try:
+    from watchfiles import awatch  # installed with uvicorn[standard]
+except ImportError:
+    awatch = None
+
+try:
+    import zstandard  # optional: recordings fall back to gzip frames
+except ImportError:
+    zstandard = None
+
+try:
+    import fcntl  # POSIX only; Windows falls back to an in-process lock
+except ImportError:
+    fcntl = None
+
+try:
+    import orjson  # optional: faster /ws serialization, stdlib json otherwise
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack  # optional: binary /ws frames for clients that ask for them
+except ImportError:
+    msgpack = None
+
 CLAUDE_DIR = Path.home() / ".claude"
 PROJECTS_DIR = CLAUDE_DIR / "projects"
 STATS_FILE = CLAUDE_DIR / "stats-cache.json"
@@ -33,66 +75,302 @@ RECORDING_DIR = CLAUDE_DIR / "monitor" / "recordings"
 _recording_active = False
 _recording_id = None           # current recording UUID
 _recording_meta = {}           # {id, startTime, projects, ...}
-_recording_offsets = {}        # {jsonl_path_str -> byte_offset}
-_async_tasks = {}              # {task_id: {status, result, error}}
+_recording_offsets = {}        # {jsonl_path_str -> (file identity, byte_offset)}
+_recording_sessions = set()    # session ids captured so far in this recording
+_recording_handles = {}        # {raw_path_str -> open append handle}, LRU order
+_recording_writers = {}        # {raw_path_str -> RawWriter buffering the next frame}
+_doc_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="docs")  # document generation
+_recording_lock = threading.RLock()   # collector thread captures while handlers start/stop
 
 app = FastAPI(title="Claude Code Monitor")
 
 # ── Task Timing Tracker ──
+#
+# Durations are kept per team in a rolling window with a running sum and
+# a sorted copy for percentiles. Start times of in-flight tasks are
+# persisted too, so a restart does not lose or mis-measure them. Writes
+# are batched: changes mark the state dirty and _flush_timing rewrites
+# the file atomically at most every TIMING_FLUSH_SECS.
 
-_task_start: dict[str, float] = {}       # {team:taskId -> epoch_ms}
-_task_durations: dict[str, list] = {}    # {team_name -> [duration_ms, ...]}
+TIMING_WINDOW = 50
+TIMING_FLUSH_SECS = 5
+TIMING_START_TTL_MS = 7 * 24 * 3600 * 1000   # drop starts of tasks never seen finishing
 
 
-def _load_timing():
-    global _task_durations
-    data = read_json(TASK_TIMING_FILE)
-    if isinstance(data, dict):
-        _task_durations = data
+class RollingStats:
+    """Mean and percentiles over the last ``size`` durations."""
+
+    __slots__ = ("window", "ordered", "total")
+
+    def __init__(self, values=(), size: int = TIMING_WINDOW):
+        self.window: deque = deque(maxlen=size)
+        self.ordered: list = []
+        self.total = 0
+        for v in values:
+            self.add(v)
 
+    def add(self, value: int):
+        if len(self.window) == self.window.maxlen:
+            old = self.window[0]
+            self.total -= old
+            del self.ordered[bisect_left(self.ordered, old)]
+        self.window.append(value)
+        self.total += value
+        insort(self.ordered, value)
 
-def _save_timing():
+    def __len__(self) -> int:
+        return len(self.window)
+
+    def mean(self) -> int:
+        return round(self.total / len(self.window)) if self.window else 0
+
+    def percentile(self, q: float) -> int:
+        """Nearest-rank percentile, ``q`` in [0, 100]."""
+        if not self.ordered:
+            return 0
+        rank = max(1, -(-len(self.ordered) * q // 100))
+        return self.ordered[int(rank) - 1]
+
+
+_task_start: dict[str, float] = {}            # {team:taskId -> epoch_ms}
+_task_durations: dict[str, RollingStats] = {}  # {team_name -> recent durations}
+_timing_lock = threading.Lock()
+_timing_dirty = False
+_timing_saved_at = 0.0
+
+
+def _load_timing():
+    """Load saved durations and in-flight starts (also accepts the old flat format)."""
+    global _task_durations, _task_start
+    data = read_json(TASK_TIMING_FILE)
+    if not isinstance(data, dict):
+        return
+    if "durations" in data or "starts" in data:
+        durations, starts = data.get("durations") or {}, data.get("starts") or {}
+    else:
+        durations, starts = data, {}
+    cutoff = time.time() * 1000 - TIMING_START_TTL_MS
+    with _timing_lock:
+        _task_durations = {
+            team: RollingStats(v for v in values if isinstance(v, (int, float)))
+            for team, values in durations.items()
+            if isinstance(values, list)
+        }
+        _task_start = {
+            key: ts for key, ts in starts.items()
+            if isinstance(ts, (int, float)) and ts >= cutoff
+        }
+
+
+def _flush_timing(force: bool = False):
+    """Write timing state if it changed, at most every TIMING_FLUSH_SECS."""
+    global _timing_dirty, _timing_saved_at
+    now = time.monotonic()
+    with _timing_lock:
+        if not _timing_dirty or (not force and now - _timing_saved_at < TIMING_FLUSH_SECS):
+            return
+        data = json.dumps({
+            "durations": {team: list(st.window) for team, st in _task_durations.items()},
+            "starts": _task_start,
+        }, ensure_ascii=False)
+        _timing_dirty = False
+        _timing_saved_at = now
+    tmp = TASK_TIMING_FILE.with_name(TASK_TIMING_FILE.name + ".tmp")
     try:
-        TASK_TIMING_FILE.write_text(
-            json.dumps(_task_durations, ensure_ascii=False),
-            encoding="utf-8",
-        )
+        tmp.write_text(data, encoding="utf-8")
+        os.replace(tmp, TASK_TIMING_FILE)
     except Exception:
-        pass
+        with _timing_lock:
+            _timing_dirty = True
+
+
+atexit.register(_flush_timing, True)
 
 
 def track_team_tasks(teams: list[dict]):
-    """Track in_progress → completed transitions, record durations."""
+    """Track in_progress → completed transitions, record durations.
+
+    Only tasks the task store re-parsed since the last call are looked at;
+    unchanged in-progress tasks keep the ``startedAt`` stamped earlier.
+    """
+    global _timing_dirty
     now = time.time() * 1000  # ms
+    team_dirs = {
+        st.config.get("name", name): name for name, st in _team_states.items() if st.config
+    }
 
-    for team in teams:
-        tname = team.get("name", "")
-        for task in team.get("tasks", []):
-            key = f"{tname}:{task['id']}"
-            status = task.get("status", "")
-
-            if status == "in_progress":
-                if key not in _task_start:
-                    _task_start[key] = now
-                task["startedAt"] = _task_start[key]
-
-            elif status == "completed":
-                if key in _task_start:
-                    dur = now - _task_start[key]
-                    if dur > 5000:  # ignore < 5s
-                        _task_durations.setdefault(tname, [])
-                        _task_durations[tname].append(round(dur))
-                        _task_durations[tname] = _task_durations[tname][-50:]
-                        _save_timing()
-                    del _task_start[key]
-
-        durations = _task_durations.get(tname, [])
-        if durations:
-            team["avgTaskMs"] = round(sum(durations) / len(durations))
-            team["taskCount"] = len(durations)
-        else:
-            team["avgTaskMs"] = 0
-            team["taskCount"] = 0
+    with _timing_lock:
+        for team in teams:
+            tname = team.get("name", "")
+            for task in _task_store.take_changed(team_dirs.get(tname, tname)):
+                key = f"{tname}:{task['id']}"
+                status = task.get("status", "")
+
+                if status == "in_progress":
+                    if key not in _task_start:
+                        _task_start[key] = now
+                        _timing_dirty = True
+                    task["startedAt"] = _task_start[key]
+
+                elif status == "completed":
+                    if key in _task_start:
+                        dur = now - _task_start[key]
+                        if dur > 5000:  # ignore < 5s
+                            _task_durations.setdefault(tname, RollingStats()).add(round(dur))
+                        del _task_start[key]
+                        _timing_dirty = True
+
+            stats = _task_durations.get(tname)
+            team["avgTaskMs"] = stats.mean() if stats else 0
+            team["p50TaskMs"] = stats.percentile(50) if stats else 0
+            team["p95TaskMs"] = stats.percentile(95) if stats else 0
+            team["taskCount"] = len(stats) if stats else 0
+    _flush_timing()
+
+
+# ── Metrics ──
+#
+# In-process counters and histograms, rendered in the Prometheus text format
+# by GET /metrics. Recording a sample is a few integer updates under a lock;
+# nothing is formatted until someone scrapes, so keeping them always on
+# costs next to nothing.
+
+METRICS_PREFIX = "claude_monitor_"
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+SIZE_BUCKETS = (1 << 10, 4 << 10, 16 << 10, 64 << 10, 256 << 10, 1 << 20, 4 << 20, 16 << 20)
+COUNT_BUCKETS = (0, 10, 100, 1_000, 10_000, 100_000, 1_000_000)
+
+# name -> (type, help); every metric recorded below is declared here
+_METRIC_HELP = {
+    "collect_seconds": ("histogram", "Wall time of one collect_all() tick"),
+    "collect_stage_seconds": ("histogram", "Wall time of one collect_all() stage"),
+    "tick_read_bytes": ("histogram", "Bytes read from ~/.claude during one tick"),
+    "tick_parsed_lines": ("histogram", "JSON lines decoded during one tick"),
+    "read_bytes_total": ("counter", "Bytes read from ~/.claude"),
+    "parsed_lines_total": ("counter", "JSON lines decoded"),
+    "message_bytes": ("histogram", "Size of an encoded /ws message"),
+    "serialize_seconds": ("histogram", "Time to encode one /ws message"),
+    "ws_send_seconds": ("histogram", "Time to hand one message to a /ws client"),
+    "ws_send_failures_total": ("counter", "/ws sends that failed or timed out"),
+    "collect_errors_total": ("counter", "Collector ticks that raised"),
+    "cache_requests_total": ("counter", "Cache lookups by cache and result"),
+    "cache_hit_ratio": ("gauge", "Hits over lookups since start, by cache"),
+    "ws_clients": ("gauge", "Connected /ws clients"),
+    "source_age_seconds": ("gauge", "Seconds since each refresh tier source was refreshed"),
+}
+
+
+class Histogram:
+    """Cumulative-bucket histogram; callers hold the registry lock."""
+
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)   # last slot: +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+def _sample(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _labels(labels: tuple) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}"
+
+
+class Metrics:
+    """Process-wide registry keyed by (metric name, sorted label pairs)."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters: dict[tuple[str, tuple], float] = {}
+        self.histograms: dict[tuple[str, tuple], Histogram] = {}
+        self.read_bytes = 0
+        self.parsed_lines = 0
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, buckets: tuple = LATENCY_BUCKETS, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            hist = self.histograms.get(key)
+            if hist is None:
+                hist = self.histograms[key] = Histogram(buckets)
+            hist.observe(value)
+
+    @contextmanager
+    def timed(self, name: str, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def read(self, nbytes: int, lines: int = 0):
+        """Account file bytes read and JSON lines decoded."""
+        with self.lock:
+            self.read_bytes += nbytes
+            self.parsed_lines += lines
+
+    def cache(self, name: str, hit: bool):
+        self.inc("cache_requests_total", cache=name, result="hit" if hit else "miss")
+
+    def render(self, gauges: dict[str, dict[tuple, float]]) -> str:
+        """Prometheus text exposition of everything recorded plus ``gauges``."""
+        with self.lock:
+            counters = dict(self.counters)
+            counters[("read_bytes_total", ())] = self.read_bytes
+            counters[("parsed_lines_total", ())] = self.parsed_lines
+            hists = {
+                k: (h.buckets, list(h.counts), h.sum, h.count)
+                for k, h in self.histograms.items()
+            }
+        hits: dict[str, list] = {}
+        for (name, labels), v in counters.items():
+            if name == "cache_requests_total":
+                d = dict(labels)
+                hits.setdefault(d["cache"], [0, 0])[d["result"] == "hit"] += v
+        gauges = dict(gauges)
+        gauges["cache_hit_ratio"] = {
+            (("cache", c),): hit / (hit + miss) for c, (miss, hit) in hits.items()
+        }
+
+        samples: dict[str, list[str]] = {}
+        for (name, labels), v in sorted(counters.items()):
+            samples.setdefault(name, []).append(f"{METRICS_PREFIX}{name}{_labels(labels)} {_sample(v)}")
+        for name, series in gauges.items():
+            for labels, v in sorted(series.items()):
+                samples.setdefault(name, []).append(f"{METRICS_PREFIX}{name}{_labels(labels)} {_sample(v)}")
+        for (name, labels), (buckets, counts, total, count) in sorted(hists.items()):
+            out = samples.setdefault(name, [])
+            cumulative = 0
+            for bound, n in zip(buckets + ("+Inf",), counts):
+                cumulative += n
+                le = bound if isinstance(bound, str) else _sample(bound)
+                out.append(f"{METRICS_PREFIX}{name}_bucket{_labels(labels + (('le', le),))} {cumulative}")
+            out.append(f"{METRICS_PREFIX}{name}_sum{_labels(labels)} {_sample(total)}")
+            out.append(f"{METRICS_PREFIX}{name}_count{_labels(labels)} {count}")
+
+        lines = []
+        for name, (kind, help_text) in _METRIC_HELP.items():
+            if name in samples:
+                lines.append(f"# HELP {METRICS_PREFIX}{name} {help_text}")
+                lines.append(f"# TYPE {METRICS_PREFIX}{name} {kind}")
+                lines.extend(samples[name])
+        return "\n".join(lines) + "\n"
+
+
+_metrics = Metrics()
 
 
 # ── Utilities ──
@@ -100,18 +378,13 @@ def track_team_tasks(teams: list[dict]):
 
 def read_json(path: Path):
     try:
-        return json.loads(path.read_text(encoding="utf-8"))
+        text = path.read_text(encoding="utf-8")
+        _metrics.read(len(text))
+        return json.loads(text)
     except Exception:
         return None
 
 
-def mtime(path: Path) -> float:
-    try:
-        return path.stat().st_mtime
-    except Exception:
-        return 0.0
-
-
 def fsize(path: Path) -> int:
     try:
         return path.stat().st_size
@@ -128,34 +401,75 @@ def tail_lines(path: Path, n: int = 40) -> list[str]:
                 return []
             chunk = min(size, n * 4096)
             f.seek(size - chunk)
-            data = f.read().decode("utf-8", errors="replace")
+            data = f.read()
+        _metrics.read(len(data))
+        data = data.decode("utf-8", errors="replace")
         return [l for l in data.strip().split("\n") if l.strip()][-n:]
     except Exception:
         return []
 
 
+def _iter_session_files():
+    """Yield (project dir name, path, stat) for every session JSONL."""
+    try:
+        with os.scandir(PROJECTS_DIR) as projects:
+            for pd in projects:
+                if not pd.is_dir():
+                    continue
+                try:
+                    with os.scandir(pd.path) as it:
+                        for de in it:
+                            if de.name.endswith(".jsonl"):
+                                try:
+                                    yield pd.name, de.path, de.stat()
+                                except OSError:
+                                    continue
+                except OSError:
+                    continue
+    except OSError:
+        return
+
+
 # ── Content Parsing ──
 
 
+def _scan_content_items(items: list) -> tuple[list[str], str]:
+    """Collect tool_use names and the last text block from content items."""
+    tools = []
+    text = ""
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        itype = item.get("type", "")
+        if itype == "tool_use":
+            name = item.get("name", "")
+            if name:
+                tools.append(name)
+        elif itype == "text":
+            t = item.get("text", "").strip()
+            if t:
+                text = t
+    return tools, text
+
+
+def extract_assistant_content(content) -> tuple[list[str], str]:
+    """Extract tool names and text from decoded assistant message content."""
+    if isinstance(content, list):
+        tools, text = _scan_content_items(content)
+        return tools, text[:300]
+    if isinstance(content, str) and len(content) >= 10:
+        return parse_assistant_content(content)
+    return [], ""
+
+
 def parse_assistant_content(content_str: str) -> tuple[list[str], str]:
-    """Parse assistant message content string to extract tool names and text."""
+    """Parse a legacy stringified assistant content to extract tool names and text."""
     tools = []
     text = ""
     try:
         items = ast.literal_eval(content_str)
         if isinstance(items, list):
-            for item in items:
-                if not isinstance(item, dict):
-                    continue
-                itype = item.get("type", "")
-                if itype == "tool_use":
-                    name = item.get("name", "")
-                    if name:
-                        tools.append(name)
-                elif itype == "text":
-                    t = item.get("text", "").strip()
-                    if t:
-                        text = t
+            tools, text = _scan_content_items(items)
     except Exception:
         # Fallback regex
         for m in re.finditer(r"'type': 'tool_use'.*?'name': '([^']+)'", content_str):
@@ -168,190 +482,495 @@ def parse_assistant_content(content_str: str) -> tuple[list[str], str]:
 
 def get_agent_reasoning(jsonl_path: Path, max_items: int = 6) -> list[dict]:
     """Extract recent assistant reasoning snippets from a session JSONL."""
-    lines = tail_lines(jsonl_path, max_items * 12)
-    items = []
-    for raw in lines:
-        try:
-            entry = json.loads(raw)
-        except json.JSONDecodeError:
-            continue
-        if entry.get("type") != "assistant":
-            continue
-        msg = entry.get("message", {})
-        if not isinstance(msg, dict):
-            continue
-        content_str = str(msg.get("content", ""))
-        if len(content_str) < 10:
-            continue
-        tools, text = parse_assistant_content(content_str)
-        if text or tools:
-            items.append({
-                "text": text[:500],
-                "tools": tools[:5],
-                "ts": entry.get("timestamp", ""),
-            })
-    return items[-max_items:]
+    return session_tail(jsonl_path).reasoning(max_items)
 
 
-# ── Session Live Detail ──
+# ── Incremental Session Readers ──
 
+TAIL_BOOTSTRAP_BYTES = 96 * 4096   # first read of an unseen file starts this far from the end
+TAIL_KEEP_LINES = 96               # digested lines kept per session for the views
+TAIL_CACHE_MAX = 256               # readers kept before the least recently used is dropped
 
-def get_session_live_detail(jsonl_path: Path) -> dict:
-    lines = tail_lines(jsonl_path, 60)
 
-    model = ""
-    last_user_msg = ""
-    last_tool = ""
-    input_tokens = 0
-    output_tokens = 0
-    cache_read = 0
-    cache_create = 0
-    slug = ""
-    cwd = ""
-    version = ""
+def _empty_live() -> dict:
+    return {
+        "model": "",
+        "lastUserMessage": "",
+        "lastTool": "",
+        "inputTokens": 0,
+        "outputTokens": 0,
+        "cacheRead": 0,
+        "cacheCreate": 0,
+        "slug": "",
+        "cwd": "",
+        "version": "",
+    }
 
-    for raw in lines:
+
+def _message_usage(msg: dict) -> dict:
+    """Return an assistant message's usage dict; legacy entries store it as a string."""
+    usage = msg.get("usage", {})
+    if isinstance(usage, str):
         try:
-            entry = json.loads(raw)
-        except json.JSONDecodeError:
-            continue
+            usage = ast.literal_eval(usage)
+        except Exception:
+            usage = {}
+    return usage if isinstance(usage, dict) else {}
+
+
+def _apply_live(live: dict, entry: dict):
+    """Fold one decoded JSONL entry into the running live-detail state."""
+    if entry.get("cwd"):
+        live["cwd"] = entry["cwd"]
+    if entry.get("version"):
+        live["version"] = entry["version"]
+    if entry.get("slug"):
+        live["slug"] = entry["slug"]
+
+    entry_type = entry.get("type", "")
+    msg = entry.get("message", {})
+
+    if entry_type == "user" and isinstance(msg, dict):
+        content = msg.get("content", "")
+        if isinstance(content, str) and content.strip():
+            live["lastUserMessage"] = content.strip()[:200]
+        elif isinstance(content, list):
+            for part in content:
+                if isinstance(part, dict) and part.get("type") == "text":
+                    text = part.get("text", "").strip()
+                    if text:
+                        live["lastUserMessage"] = text[:200]
+                        break
+
+    elif entry_type == "assistant" and isinstance(msg, dict):
+        if msg.get("model"):
+            live["model"] = msg["model"]
+        usage = _message_usage(msg)
+        if usage:
+            it = usage.get("input_tokens", 0)
+            ot = usage.get("output_tokens", 0)
+            if it:
+                live["inputTokens"] = it
+            if ot:
+                live["outputTokens"] = ot
+            live["cacheRead"] = usage.get("cache_read_input_tokens", 0)
+            live["cacheCreate"] = usage.get("cache_creation_input_tokens", 0)
+
+    elif entry_type == "progress":
+        data = entry.get("data", {})
+        if isinstance(data, dict) and data.get("type") == "hook_progress":
+            hook_name = data.get("hookName", "")
+            if ":" in hook_name:
+                live["lastTool"] = hook_name.split(":")[-1]
+
+
+def _digest_entry(entry: dict) -> tuple[dict | None, dict | None]:
+    """Reduce a decoded entry to its (conversation turn, reasoning item)."""
+    entry_type = entry.get("type", "")
+    ts = entry.get("timestamp", "")
+    msg = entry.get("message", {})
+    if not isinstance(msg, dict):
+        return None, None
+
+    if entry_type == "user":
+        content = msg.get("content", "")
+        text = ""
+        has_tool_result = False
+        if isinstance(content, str) and content.strip():
+            text = content.strip()
+        elif isinstance(content, list):
+            for part in content:
+                if isinstance(part, dict):
+                    if part.get("type") == "text":
+                        t = part.get("text", "").strip()
+                        if t:
+                            text = t
+                    elif part.get("type") == "tool_result":
+                        has_tool_result = True
+        if text:
+            return {"role": "user", "text": text[:200], "ts": ts}, None
+        if has_tool_result:
+            return {"role": "tool_result", "text": "(tool result)", "ts": ts}, None
+
+    elif entry_type == "assistant":
+        tools, text = extract_assistant_content(msg.get("content", ""))
+        if tools or text:
+            turn = {"role": "assistant", "ts": ts}
+            if tools:
+                turn["tools"] = tools
+            if text:
+                turn["text"] = text[:200]
+            return turn, {"text": text[:500], "tools": tools[:5], "ts": ts}
 
-        if entry.get("cwd"):
-            cwd = entry["cwd"]
-        if entry.get("version"):
-            version = entry["version"]
-        if entry.get("slug"):
-            slug = entry["slug"]
-
-        entry_type = entry.get("type", "")
-        msg = entry.get("message", {})
-
-        if entry_type == "user" and isinstance(msg, dict):
-            content = msg.get("content", "")
-            if isinstance(content, str) and content.strip():
-                last_user_msg = content.strip()[:200]
-            elif isinstance(content, list):
-                for part in content:
-                    if isinstance(part, dict) and part.get("type") == "text":
-                        text = part.get("text", "").strip()
-                        if text:
-                            last_user_msg = text[:200]
-                            break
-
-        elif entry_type == "assistant" and isinstance(msg, dict):
-            if msg.get("model"):
-                model = msg["model"]
-            usage = msg.get("usage", {})
-            if isinstance(usage, str):
-                try:
-                    usage = ast.literal_eval(usage)
-                except Exception:
-                    usage = {}
-            if isinstance(usage, dict):
-                it = usage.get("input_tokens", 0)
-                ot = usage.get("output_tokens", 0)
-                if it:
-                    input_tokens = it
-                if ot:
-                    output_tokens = ot
-                cache_read = usage.get("cache_read_input_tokens", 0)
-                cache_create = usage.get("cache_creation_input_tokens", 0)
-
-        elif entry_type == "progress":
-            data = entry.get("data", {})
-            if isinstance(data, dict) and data.get("type") == "hook_progress":
-                hook_name = data.get("hookName", "")
-                if ":" in hook_name:
-                    last_tool = hook_name.split(":")[-1]
+    return None, None
 
-    return {
-        "model": model,
-        "lastUserMessage": last_user_msg,
-        "lastTool": last_tool,
-        "inputTokens": input_tokens,
-        "outputTokens": output_tokens,
-        "cacheRead": cache_read,
-        "cacheCreate": cache_create,
-        "slug": slug,
-        "cwd": cwd,
-        "version": version,
-    }
 
+class SessionTail:
+    """Single parsed view of a session JSONL, read incrementally.
 
-# ── Session Conversation Extraction ──
+    Each complete line appended since the previous refresh is decoded exactly
+    once, folded into the running live state and reduced to a compact
+    reasoning record. Derived views are memoized
+    on (st_dev, st_ino, size) and recomputed only when the file grows. A new
+    inode or a file shorter than the saved offset (rotation, truncation)
+    restarts the reader from the tail of the file.
+    """
 
+    def __init__(self):
+        self.ident: tuple[int, int] | None = None   # (st_dev, st_ino)
+        self.offset = 0
+        self.size = -1
+        self.records: deque = deque(maxlen=TAIL_KEEP_LINES)
+        self.live = _empty_live()
+        self._views: dict = {}
 
-def get_session_conversation(jsonl_path: Path, max_turns: int = 12) -> list[dict]:
-    """Extract recent conversation turns from a session JSONL."""
-    lines = tail_lines(jsonl_path, max_turns * 8)
+    def refresh(self, path: Path, st: os.stat_result | None = None):
+        if st is None:
+            try:
+                st = path.stat()
+            except OSError:
+                return
+        ident = (st.st_dev, st.st_ino)
+        unchanged = ident == self.ident and st.st_size == self.size
+        _metrics.cache("sessionTail", unchanged)
+        if unchanged:
+            return
+        bootstrap = ident != self.ident or st.st_size < self.offset
+        if bootstrap:
+            self.ident = ident
+            self.offset = max(0, st.st_size - TAIL_BOOTSTRAP_BYTES)
+            self.records.clear()
+            self.live = _empty_live()
+            self._views.clear()
+        self.size = st.st_size
+        if st.st_size <= self.offset:
+            return
 
-    turns = []
-    for raw in lines:
         try:
-            entry = json.loads(raw)
-        except json.JSONDecodeError:
-            continue
-
-        entry_type = entry.get("type", "")
-        ts = entry.get("timestamp", "")
-
-        if entry_type == "user":
-            msg = entry.get("message", {})
-            if not isinstance(msg, dict):
+            with open(path, "rb") as f:
+                f.seek(self.offset)
+                data = f.read(st.st_size - self.offset)
+        except OSError:
+            self.size = -1
+            return
+        _metrics.read(len(data))
+
+        start = 0
+        if bootstrap and self.offset > 0:
+            # Started mid-file: drop the partial first line
+            start = data.find(b"\n") + 1
+            if start == 0:
+                self.offset = st.st_size
+                return
+        end = data.rfind(b"\n") + 1
+        if end <= start:
+            return  # no complete line yet, retry when the file grows
+        self.offset += end
+        self._views.clear()
+
+        lines = 0
+        for raw in data[start:end].split(b"\n"):
+            if not raw.strip():
                 continue
-            content = msg.get("content", "")
-            text = ""
-            has_tool_result = False
-            if isinstance(content, str) and content.strip():
-                text = content.strip()
-            elif isinstance(content, list):
-                for part in content:
-                    if isinstance(part, dict):
-                        if part.get("type") == "text":
-                            t = part.get("text", "").strip()
-                            if t:
-                                text = t
-                        elif part.get("type") == "tool_result":
-                            has_tool_result = True
-            if text:
-                turns.append({"role": "user", "text": text[:200], "ts": ts})
-            elif has_tool_result:
-                turns.append({"role": "tool_result", "text": "(tool result)", "ts": ts})
-
-        elif entry_type == "assistant":
-            msg = entry.get("message", {})
-            if not isinstance(msg, dict):
+            lines += 1
+            try:
+                entry = json.loads(raw)
+            except ValueError:
                 continue
-            content_str = str(msg.get("content", ""))
-            if len(content_str) < 10:
+            if not isinstance(entry, dict):
                 continue
-            tools, text = parse_assistant_content(content_str)
-            if tools or text:
-                turn = {"role": "assistant", "ts": ts}
-                if tools:
-                    turn["tools"] = tools
-                if text:
-                    turn["text"] = text[:200]
-                turns.append(turn)
-
-    return turns[-max_turns:]
+            _apply_live(self.live, entry)
+            self.records.append(_digest_entry(entry)[1])
+        _metrics.read(0, lines)
+
+    def reasoning(self, max_items: int) -> list[dict]:
+        key = ("reasoning", max_items)
+        if key not in self._views:
+            window = list(self.records)[-max_items * 12:]
+            items = [item for item in window if item]
+            self._views[key] = items[-max_items:]
+        return list(self._views[key])
+
+
+_session_tails: dict[str, SessionTail] = {}   # insertion order doubles as LRU order
+
+
+def session_tail(jsonl_path: Path, st: os.stat_result | None = None) -> SessionTail:
+    """Return the refreshed shared reader for a session JSONL."""
+    key = str(jsonl_path)
+    tail = _session_tails.pop(key, None)
+    if tail is None:
+        tail = SessionTail()
+        while len(_session_tails) >= TAIL_CACHE_MAX:
+            del _session_tails[next(iter(_session_tails))]
+    _session_tails[key] = tail
+    tail.refresh(jsonl_path, st)
+    return tail
+
+
+# ── Session Conversation Pages ──
+#
+# Conversations are not part of the snapshot; the dashboard fetches them
+# page by page for the session a user expands. Each JSONL file gets a
+# sparse index holding the byte offset of every CONV_INDEX_STRIDE-th
+# line, extended as the file grows, so any page is a seek plus a read of
+# a few stride-sized blocks. Page cursors are line numbers.
+
+CONV_INDEX_STRIDE = 64
+CONV_INDEX_MAX = 64
+CONV_PAGE_MAX = 100
+
+
+class LineIndex:
+    """Sparse line-offset index over the complete lines of a JSONL file."""
+
+    def __init__(self):
+        self.ident: tuple[int, int] | None = None
+        self.marks = [0]      # marks[k] = offset of line k * CONV_INDEX_STRIDE
+        self.lines = 0
+        self.offset = 0       # end of the last complete line
+
+    def refresh(self, path: Path):
+        st = path.stat()
+        ident = (st.st_dev, st.st_ino)
+        if ident != self.ident or st.st_size < self.offset:
+            self.ident = ident
+            self.marks = [0]
+            self.lines = 0
+            self.offset = 0
+        if st.st_size == self.offset:
+            return
+        with open(path, "rb") as f:
+            f.seek(self.offset)
+            pos = self.offset
+            while chunk := f.read(1 << 20):
+                start = 0
+                while (nl := chunk.find(b"\n", start)) != -1:
+                    self.lines += 1
+                    start = nl + 1
+                    self.offset = pos + start
+                    if self.lines % CONV_INDEX_STRIDE == 0:
+                        self.marks.append(self.offset)
+                pos += len(chunk)
+
+    def _block(self, f, k: int, lo: int, hi: int) -> list[dict]:
+        """Turns on lines [lo, hi) of index block ``k``."""
+        start = self.marks[k]
+        end = self.marks[k + 1] if k + 1 < len(self.marks) else self.offset
+        f.seek(start)
+        turns = []
+        for i, raw in enumerate(f.read(end - start).split(b"\n")):
+            line = k * CONV_INDEX_STRIDE + i
+            if line >= hi:
+                break
+            if line < lo:
+                continue
+            try:
+                entry = json.loads(raw)
+            except ValueError:
+                continue
+            if isinstance(entry, dict):
+                turn = _digest_entry(entry)[0]
+                if turn:
+                    turn["line"] = line
+                    turns.append(turn)
+        return turns
+
+    def page(self, path: Path, before: int | None, limit: int) -> dict:
+        """Up to ``limit`` turns ending before line ``before`` (default: the end)."""
+        before = self.lines if before is None else max(0, min(before, self.lines))
+        turns: list[dict] = []
+        k = (before - 1) // CONV_INDEX_STRIDE if before else -1
+        with open(path, "rb") as f:
+            while k >= 0 and len(turns) <= limit:
+                turns[:0] = self._block(f, k, 0, before)
+                k -= 1
+        page = turns[-limit:]
+        more = bool(page) and (len(turns) > len(page) or k >= 0)
+        return {
+            "turns": page,
+            "before": page[0]["line"] if more else None,
+            "lines": self.lines,
+        }
+
+    def page_after(self, path: Path, after: int, limit: int) -> dict:
+        """Up to ``limit`` turns from line ``after`` on, for catching up."""
+        turns: list[dict] = []
+        k = max(0, after) // CONV_INDEX_STRIDE
+        with open(path, "rb") as f:
+            while k < len(self.marks) and len(turns) <= limit:
+                turns += self._block(f, k, after, self.lines)
+                k += 1
+        page = turns[:limit]
+        return {
+            "turns": page,
+            "after": page[-1]["line"] + 1 if len(turns) > limit else None,
+            "lines": self.lines,
+        }
+
+
+_line_indexes: dict[str, LineIndex] = {}   # insertion order doubles as LRU order
+_line_index_lock = threading.Lock()
+
+
+def get_conversation_page(jsonl_path: Path, before: int | None = None, limit: int = 20,
+                          after: int | None = None) -> dict:
+    """One page of conversation turns, oldest first, with the cursor for the next.
+
+    ``before`` pages back through history; ``after`` fetches turns appended
+    since a line the client already has.
+    """
+    key = str(jsonl_path)
+    with _line_index_lock:
+        index = _line_indexes.pop(key, None)
+        if index is None:
+            index = LineIndex()
+            while len(_line_indexes) >= CONV_INDEX_MAX:
+                del _line_indexes[next(iter(_line_indexes))]
+        _line_indexes[key] = index
+        index.refresh(jsonl_path)
+        limit = max(1, min(limit, CONV_PAGE_MAX))
+        if after is not None:
+            return index.page_after(jsonl_path, after, limit)
+        return index.page(jsonl_path, before, limit)
+
+
+# ── Refresh Schedule ──
+
+# Each data source is refreshed on its own cadence: (interval, staleness
+# budget) in seconds. A source whose interval has passed may be put off while
+# the tick is over its time budget, but never once it is older than its
+# staleness budget. File watcher changes and forced refreshes make a source
+# due right away.
+REFRESH_TIERS = {
+    "activeSessions": (1, 5),      # active session tails; also the collector tick
+    "teams": (2, 10),
+    "recentSessions": (10, 30),
+    "tasks": (10, 60),
+    "history": (30, 120),
+    "idleProjects": (60, 300),     # idle sessions and projects with nothing active or recent
+    "stats": (60, 300),
+    "catalog": (10, 60),           # SQLite usage catalog ingestion
+}
+
+# What a forced refresh of a snapshot section refreshes
+_SECTION_SOURCES = {
+    "summary": ("activeSessions", "recentSessions", "idleProjects"),
+    "projects": ("activeSessions", "recentSessions", "idleProjects"),
+    "stats": ("stats",),
+    "teams": ("teams",),
+    "tasks": ("tasks",),
+    "history": ("history",),
+}
+
+
+class RefreshSchedule:
+    """Last refresh time per source, and the sources forced for the next tick."""
+
+    def __init__(self, tiers: dict[str, tuple[float, float]]):
+        self.tiers = tiers
+        self.lock = threading.Lock()
+        self.updated: dict[str, float] = {}   # source -> wall time of its last refresh
+        self.forced: set[str] = set()
+
+    def age(self, source: str, now: float) -> float:
+        last = self.updated.get(source)
+        return float("inf") if last is None else now - last
+
+    def stale(self, source: str, now: float) -> bool:
+        """True when the source is past its staleness budget."""
+        return self.age(source, now) >= self.tiers[source][1]
+
+    def due(self, source: str, now: float, dirty: bool = False) -> bool:
+        """Whether ``source`` should be refreshed this tick; ``dirty`` = watcher saw it change."""
+        with self.lock:
+            if dirty or source in self.forced:
+                return True
+        if self.age(source, now) < self.tiers[source][0]:
+            return False
+        return self.stale(source, now) or not over_budget(source)
+
+    def mark(self, source: str, now: float):
+        with self.lock:
+            self.updated[source] = now
+            self.forced.discard(source)
+
+    def force(self, sections: list[str] | None = None) -> list[str]:
+        """Make the sources behind ``sections`` (None: all) due on the next tick."""
+        sources = set()
+        for name in sections if sections is not None else list(_SECTION_SOURCES):
+            if name in _SECTION_SOURCES:
+                sources.update(_SECTION_SOURCES[name])
+            elif name in self.tiers:
+                sources.add(name)
+        with self.lock:
+            self.forced |= sources
+        return sorted(sources)
+
+
+_schedule = RefreshSchedule(REFRESH_TIERS)
 
 
 # ── Project & Session Scanning ──
 
 
-def get_all_projects() -> list[dict]:
-    if not PROJECTS_DIR.exists():
-        return []
+IDLE_RESTAT_SECS = REFRESH_TIERS["idleProjects"][0]   # idle sessions can only wake up by being written
+POLL_IDLE_RESTAT_SECS = 5   # the same while polling, with no watcher to report those writes
+RACY_DIR_SECS = 2       # a directory modified this recently is always re-listed
 
-    now = time.time()
-    projects = []
 
-    for project_dir in PROJECTS_DIR.iterdir():
-        if not project_dir.is_dir():
-            continue
+def _session_status(age: float) -> str:
+    if age < ACTIVE_SECS:
+        return "active"
+    if age < RECENT_SECS:
+        return "recent"
+    return "idle"
+
 
-        index_data = read_json(project_dir / "sessions-index.json")
+def _idle_restat_secs() -> float:
+    return IDLE_RESTAT_SECS if PROJECTS_DIR in _watch_roots else POLL_IDLE_RESTAT_SECS
+
+
+def _stat_sig(path: Path) -> tuple[int, int] | None:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class ProjectScan:
+    """Cached scan state of one project directory.
+
+    The directory is only re-listed when its mtime changes (new, removed or
+    renamed sessions). Active sessions are re-stat'ed every tick and recent
+    ones on the "recentSessions" tier; idle sessions can only change bucket
+    by being written to, so they are re-stat'ed on a slow, staggered cadence.
+    sessions-index.json is parsed again only when its (mtime, size) changes.
+    """
+
+    def __init__(self, project_dir: Path):
+        self.dir = project_dir
+        self.dir_mtime: int | None = None
+        self.index_sig: tuple[int, int] | None = None
+        self.name = ""
+        self.path = ""
+        self.session_meta: dict[str, dict] = {}
+        self.files: dict[str, list] = {}      # sid -> [mtime, size, next_check]
+        self.sessions: dict[str, dict] = {}   # sid -> session dict
+        self.order: list[dict] = []
+        self.stale: set[str] = set()          # sessions whose tail needs reading
+        self.dirty = True
+        self.result: dict | None = None       # last refresh() result
+        self.idle = False                     # no active or recent session at last refresh
+        self.next_check = 0.0                 # earliest idle re-stat due in the polling path
+
+    def _load_index(self):
+        sig = _stat_sig(self.dir / "sessions-index.json")
+        if sig == self.index_sig and self.name:
+            return
+        self.index_sig = sig
+        index_data = read_json(self.dir / "sessions-index.json") if sig else None
 
         if index_data and isinstance(index_data, dict):
             original_path = index_data.get("originalPath", "")
@@ -361,19 +980,19 @@ def get_all_projects() -> list[dict]:
             entries = []
 
         if original_path:
-            project_name = Path(original_path).name or original_path
-            project_path = original_path
+            self.name = Path(original_path).name or original_path
+            self.path = original_path
         else:
-            dirname = project_dir.name
+            dirname = self.dir.name
             segments = [s for s in dirname.split("-") if s]
-            project_name = segments[-1] if segments else dirname
-            project_path = dirname
+            self.name = segments[-1] if segments else dirname
+            self.path = dirname
 
-        session_meta = {}
+        self.session_meta = {}
         for e in entries:
             sid = e.get("sessionId", "")
             if sid:
-                session_meta[sid] = {
+                self.session_meta[sid] = {
                     "summary": e.get("summary", ""),
                     "firstPrompt": e.get("firstPrompt", ""),
                     "messageCount": e.get("messageCount", 0),
@@ -382,74 +1001,248 @@ def get_all_projects() -> list[dict]:
                     "gitBranch": e.get("gitBranch", ""),
                     "isSidechain": e.get("isSidechain", False),
                 }
+        self.sessions = {}
+        self.dirty = True
+
+    def _track(self, sid: str, st: os.stat_result, now: float):
+        rec = self.files.get(sid)
+        mt, size = st.st_mtime, st.st_size
+        if rec is None:
+            # Stagger idle re-checks so they don't all land on the same tick
+            rec = self.files[sid] = [mt, size, now + hash(sid) % _idle_restat_secs()]
+            self.dirty = True
+        elif rec[0] != mt or rec[1] != size:
+            rec[0], rec[1] = mt, size
+            session = self.sessions.get(sid)
+            if session is not None:
+                session["mtime"] = mt
+                session["fileSize"] = size
+                _session_index.put(self.dir.name, session)
+            self.stale.add(sid)
+            self.dirty = True
+        if now - mt >= RECENT_SECS and now >= rec[2]:
+            rec[2] = now + _idle_restat_secs()
+
+    def _list_dir(self, now: float) -> dict[str, os.stat_result]:
+        stats = {}
+        try:
+            with os.scandir(self.dir) as it:
+                for de in it:
+                    if not de.name.endswith(".jsonl"):
+                        continue
+                    try:
+                        stats[de.name[:-6]] = de.stat()
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+        for sid in [k for k in self.files if k not in stats]:
+            del self.files[sid]
+            self.sessions.pop(sid, None)
+            _session_index.drop(self.dir.name, sid)
+            self.dirty = True
+        for sid, st in stats.items():
+            self._track(sid, st, now)
+        return stats
+
+    def _stat_sessions(self, sids: list[str], now: float) -> dict[str, os.stat_result]:
+        fresh = {}
+        for sid in sids:
+            try:
+                st = os.stat(self.dir / f"{sid}.jsonl")
+            except OSError:
+                if self.files.pop(sid, None) is not None:
+                    self.sessions.pop(sid, None)
+                    _session_index.drop(self.dir.name, sid)
+                    self.dirty = True
+                continue
+            fresh[sid] = st
+            self._track(sid, st, now)
+        return fresh
+
+    def refresh(
+        self, now: float, dir_mtime: int | None = None, touched: set[str] | None = None,
+        recent: bool = True,
+    ) -> dict:
+        """Refresh from stat deltas, or only the names the file watcher reported.
+
+        With ``touched`` given, the watcher vouches that no other file in the
+        directory changed since the previous refresh, so nothing else is stat'ed.
+        ``recent`` False re-stats only active sessions (and idle ones due).
+        """
+        if touched is None:
+            self._load_index()
+            if dir_mtime != self.dir_mtime or now - dir_mtime / 1e9 < RACY_DIR_SECS:
+                self.dir_mtime = dir_mtime
+                fresh = self._list_dir(now)
+            else:
+                window = RECENT_SECS if recent else ACTIVE_SECS
+                due = [
+                    sid for sid, rec in self.files.items()
+                    if now - rec[0] < window or now >= rec[2]
+                ]
+                fresh = self._stat_sessions(due, now)
+        else:
+            if "sessions-index.json" in touched:
+                self._load_index()
+            fresh = self._stat_sessions(
+                [n[:-6] for n in touched if n.endswith(".jsonl")], now
+            )
 
-        sessions = []
         has_active = False
         has_recent = False
         latest_mtime = 0.0
+        active_count = recent_count = 0
+        next_check = float("inf")
 
-        for f in project_dir.iterdir():
-            if f.suffix != ".jsonl":
-                continue
-
-            sid = f.stem
-            mt = mtime(f)
+        for sid, rec in self.files.items():
+            mt = rec[0]
+            next_check = min(next_check, rec[2])
             age = now - mt
+            status = _session_status(age)
             latest_mtime = max(latest_mtime, mt)
 
-            if age < ACTIVE_SECS:
-                status = "active"
+            session = self.sessions.get(sid)
+            if session is None:
+                meta = self.session_meta.get(sid, {})
+                session = self.sessions[sid] = {
+                    "sessionId": sid[:8],
+                    "fullId": sid,
+                    "status": status,
+                    "age": age,
+                    "mtime": mt,
+                    "fileSize": rec[1],
+                    "summary": meta.get("summary", ""),
+                    "firstPrompt": meta.get("firstPrompt", ""),
+                    "messageCount": meta.get("messageCount", 0),
+                    "created": meta.get("created", ""),
+                    "modified": meta.get("modified", ""),
+                    "gitBranch": meta.get("gitBranch", ""),
+                    "isSidechain": meta.get("isSidechain", False),
+                    "live": None,
+                }
+                _session_index.put(self.dir.name, session)
+            session["age"] = age
+            if session["status"] != status:
+                session["status"] = status
+                self.dirty = True
+
+            if status == "active":
                 has_active = True
-            elif age < RECENT_SECS:
-                status = "recent"
+                active_count += 1
+            elif status == "recent":
                 has_recent = True
-            else:
-                status = "idle"
-
-            meta = session_meta.get(sid, {})
-
-            session = {
-                "sessionId": sid[:8],
-                "fullId": sid,
-                "status": status,
-                "age": age,
-                "mtime": mt,
-                "fileSize": fsize(f),
-                "summary": meta.get("summary", ""),
-                "firstPrompt": meta.get("firstPrompt", ""),
-                "messageCount": meta.get("messageCount", 0),
-                "created": meta.get("created", ""),
-                "modified": meta.get("modified", ""),
-                "gitBranch": meta.get("gitBranch", ""),
-                "isSidechain": meta.get("isSidechain", False),
-                "live": None,
-                "conversation": None,
-            }
+                recent_count += 1
 
             if status in ("active", "recent"):
-                session["live"] = get_session_live_detail(f)
-                session["conversation"] = get_session_conversation(f, 12)
-
-            sessions.append(session)
-
-        status_order = {"active": 0, "recent": 1, "idle": 2}
-        sessions.sort(key=lambda s: (status_order.get(s["status"], 9), -s["mtime"]))
-
-        active_count = sum(1 for s in sessions if s["status"] == "active")
-        recent_count = sum(1 for s in sessions if s["status"] == "recent")
-
-        projects.append({
-            "name": project_name,
-            "path": project_path,
-            "dirName": project_dir.name,
-            "totalSessions": len(sessions),
+                if sid in self.stale or session["live"] is None:
+                    if not claim_tail_read():
+                        self.stale.add(sid)
+                    else:
+                        self.stale.discard(sid)
+                        tail = session_tail(self.dir / f"{sid}.jsonl", fresh.get(sid))
+                        session["live"] = dict(tail.live)
+                        _session_index.note_model(sid, tail.live.get("model"))
+            else:
+                self.stale.discard(sid)
+                if session["live"] is not None:
+                    session["live"] = None
+
+        if self.dirty:
+            # Idle sessions stay out of the snapshot; /api/sessions pages them
+            self.order = sorted(
+                (s for s in self.sessions.values() if s["status"] != "idle"),
+                key=lambda s: (s["status"] != "active", -s["mtime"]),
+            )
+            self.dirty = False
+
+        self.idle = not (has_active or has_recent)
+        self.next_check = next_check
+        self.result = {
+            "name": self.name,
+            "path": self.path,
+            "dirName": self.dir.name,
+            "totalSessions": len(self.files),
             "activeSessions": active_count,
             "recentSessions": recent_count,
+            "idleSessions": len(self.files) - active_count - recent_count,
             "hasActive": has_active,
             "hasRecent": has_recent,
             "latestMtime": latest_mtime,
-            "sessions": sessions,
-        })
+            "sessions": self.order,
+        }
+        return self.result
+
+
+_project_scans: dict[str, ProjectScan] = {}
+
+
+def _cached_idle(scan: ProjectScan, now: float, dir_mtime: int | None = None) -> bool:
+    """An idle project nothing happened in can keep its last result until its tier is due.
+
+    When polling (``dir_mtime`` given) that also needs none of its sessions to
+    be due for an idle re-stat, so a resumed session is seen within
+    POLL_IDLE_RESTAT_SECS without the watcher.
+    """
+    if not scan.idle or scan.result is None:
+        return False
+    hit = dir_mtime is None or (
+        dir_mtime == scan.dir_mtime and now - dir_mtime / 1e9 >= RACY_DIR_SECS
+        and now < scan.next_check
+    )
+    _metrics.cache("idleProject", hit)
+    return hit
+
+
+def get_all_projects(changes: dict[str, set[str]] | None = None) -> list[dict]:
+    """Scan all projects; ``changes`` holds watcher-reported names, None polls."""
+    if not PROJECTS_DIR.exists():
+        return []
+
+    now = time.time()
+    projects = []
+    recent = _schedule.due("recentSessions", now)
+    idle = _schedule.due("idleProjects", now)
+    if idle:
+        changes = None   # the idle tier doubles as a full polling pass
+
+    if changes is not None and "" not in changes and all(
+        name in _project_scans for name in changes
+    ):
+        for name, scan in _project_scans.items():
+            touched = changes.get(name, set())
+            if not touched and _cached_idle(scan, now):
+                projects.append(scan.result)
+            else:
+                projects.append(scan.refresh(now, touched=touched, recent=recent))
+    else:
+        try:
+            with os.scandir(PROJECTS_DIR) as it:
+                dirs = [(de.name, de.stat().st_mtime_ns) for de in it if de.is_dir()]
+        except OSError:
+            return []
+
+        seen = set()
+        for name, dir_mtime in dirs:
+            seen.add(name)
+            scan = _project_scans.get(name)
+            if scan is None or changes is None:
+                if scan is None:
+                    scan = _project_scans[name] = ProjectScan(PROJECTS_DIR / name)
+                if not idle and _cached_idle(scan, now, dir_mtime):
+                    projects.append(scan.result)
+                else:
+                    projects.append(scan.refresh(now, dir_mtime, recent=recent or idle))
+            else:
+                projects.append(scan.refresh(now, touched=changes.get(name, set()), recent=recent))
+
+        for name in [k for k in _project_scans if k not in seen]:
+            del _project_scans[name]
+            _session_index.drop(name)
+
+    for source, ran in (("recentSessions", recent), ("idleProjects", idle)):
+        if ran:
+            _schedule.mark(source, now)
 
     projects.sort(key=lambda p: (
         0 if p["hasActive"] else (1 if p["hasRecent"] else 2),
@@ -459,6 +1252,160 @@ def get_all_projects() -> list[dict]:
     return projects
 
 
+# ── Session Index ──
+#
+# Every scanned session, kept sorted under each sort key so /api/sessions
+# walks from a cursor instead of filtering and sorting the full set per
+# request. ProjectScan reports sessions as they appear, change and vanish.
+
+SESSION_SORTS = ("mtime", "created", "messageCount", "fileSize")
+SESSION_PAGE_MAX = 200
+
+
+def _sort_value(session: dict, key: str):
+    if key == "created":
+        return str(session.get(key) or "")
+    # sessions-index.json is not ours; one odd value must not break insort
+    try:
+        value = float(session.get(key) or 0)
+    except (TypeError, ValueError):
+        return 0.0
+    return value if math.isfinite(value) else 0.0
+
+
+class SessionIndex:
+    """Session dicts by (dirName, sessionId), with one sorted list per sort key."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.items: dict[tuple[str, str], dict] = {}
+        self.values: dict[tuple[str, str], tuple] = {}   # sort values currently indexed
+        self.sorted: dict[str, list[tuple]] = {k: [] for k in SESSION_SORTS}
+        self.models: dict[str, str] = {}                 # sid -> last model seen
+        self.models_loaded = False
+
+    def _unlink(self, key: tuple[str, str]):
+        for k, v in zip(SESSION_SORTS, self.values.pop(key)):
+            entries = self.sorted[k]
+            i = bisect_left(entries, (v,) + key)
+            if i < len(entries) and entries[i] == (v,) + key:
+                del entries[i]
+
+    def put(self, dir_name: str, session: dict):
+        key = (dir_name, session["fullId"])
+        values = tuple(_sort_value(session, k) for k in SESSION_SORTS)
+        with self.lock:
+            self.items[key] = session
+            if self.values.get(key) == values:
+                return
+            if key in self.values:
+                self._unlink(key)
+            self.values[key] = values
+            for k, v in zip(SESSION_SORTS, values):
+                insort(self.sorted[k], (v,) + key)
+
+    def drop(self, dir_name: str, sid: str | None = None):
+        """Forget one session, or every session of a project."""
+        with self.lock:
+            keys = [(dir_name, sid)] if sid else [k for k in self.items if k[0] == dir_name]
+            for key in keys:
+                if self.items.pop(key, None) is not None:
+                    self._unlink(key)
+
+    def note_model(self, sid: str, model: str | None):
+        if model:
+            self.models[sid] = model
+
+    def _load_models(self):
+        """Seed models of sessions not tailed since startup from the catalog."""
+        self.models_loaded = True
+        if not CATALOG_ENABLED:
+            return
+        try:
+            known = _catalog.models()
+        except sqlite3.Error:
+            return
+        for sid, model in known.items():
+            self.models.setdefault(sid, model)
+
+    def query(self, status: set[str] | None = None, project: str = "", branch: str = "",
+              model: str = "", sidechain: bool | None = None, since: float = 0.0,
+              sort: str = "mtime", desc: bool = True, cursor: list | None = None,
+              limit: int = 50) -> dict:
+        if model and not self.models_loaded:
+            self._load_models()
+        now = time.time()
+        rows, last, more = [], None, False
+        with self.lock:
+            entries = self.sorted[sort]
+            if cursor is not None:
+                i = bisect_left(entries, tuple(cursor)) - 1 if desc else bisect_right(entries, tuple(cursor))
+            elif desc:
+                i = len(entries) - 1
+            else:
+                i = bisect_left(entries, (since,)) if sort == "mtime" else 0
+            step = -1 if desc else 1
+            while 0 <= i < len(entries):
+                entry = entries[i]
+                i += step
+                dir_name, sid = entry[1], entry[2]
+                s = self.items[(dir_name, sid)]
+                if s["mtime"] < since:
+                    if desc and sort == "mtime":
+                        break
+                    continue
+                if status and _session_status(now - s["mtime"]) not in status:
+                    continue
+                if project and dir_name != project:
+                    continue
+                if branch and s.get("gitBranch") != branch:
+                    continue
+                if sidechain is not None and bool(s.get("isSidechain")) != sidechain:
+                    continue
+                m = (s.get("live") or {}).get("model") or self.models.get(sid, "")
+                if model and m != model:
+                    continue
+                if len(rows) == limit:
+                    more = True
+                    break
+                row = dict(s)
+                row["project"] = dir_name
+                row["age"] = now - s["mtime"]
+                row["status"] = _session_status(row["age"])
+                row["model"] = m
+                rows.append(row)
+                last = entry
+        return {
+            "sessions": rows,
+            "next": _encode_cursor(sort, last) if more else None,
+        }
+
+
+def _encode_cursor(sort: str, entry: tuple) -> str:
+    return base64.urlsafe_b64encode(json.dumps([sort, *entry]).encode()).decode()
+
+
+def _decode_cursor(cursor: str, sort: str) -> list | None:
+    try:
+        decoded = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(decoded, list) or len(decoded) != 4 or decoded[0] != sort:
+        return None
+    value, dir_name, sid = decoded[1:]
+    if sort == "created":
+        valid = isinstance(value, str)
+    else:
+        valid = (isinstance(value, (int, float)) and not isinstance(value, bool)
+                 and math.isfinite(value))
+    if not (valid and isinstance(dir_name, str) and isinstance(sid, str)):
+        return None
+    return decoded[1:]
+
+
+_session_index = SessionIndex()
+
+
 # ── Global Stats ──
 
 
@@ -477,34 +1424,369 @@ def get_stats() -> dict:
     }
 
 
+# ── Task Store ──
+#
+# One cache of every task file under TASKS_DIR, re-parsed only when a
+# file's (mtime, size) changes. Status counters are adjusted as tasks
+# come and go, so the team view, the global summary and the duration
+# tracker all read the same parsed tasks.
+
+_TASK_ORDER = {"in_progress": 0, "pending": 1, "completed": 2}
+_TASK_COUNTERS = {"completed": "completed", "in_progress": "inProgress", "pending": "pending"}
+
+
+def _task_view(td: dict, stem: str) -> dict:
+    return {
+        "id": td.get("id", stem),
+        "subject": td.get("subject", "")[:80],
+        "description": td.get("description", "")[:200],
+        "activeForm": td.get("activeForm", ""),
+        "status": td.get("status", ""),
+        "owner": td.get("owner", ""),
+        "blockedBy": [
+            b for b in td.get("blockedBy", [])
+            if isinstance(b, str)
+        ],
+    }
+
+
+class TaskStore:
+    """Parsed task files per task list directory, with running status counts."""
+
+    def __init__(self):
+        self.lists: dict[str, dict[str, tuple]] = {}   # list dir -> file name -> (sig, view)
+        self.counts = {"total": 0, "completed": 0, "inProgress": 0, "pending": 0}
+        self._sorted: dict[str, list[dict]] = {}
+        self._changed: dict[str, dict[str, dict]] = {}  # list dir -> file name -> new view
+
+    def _count(self, view: dict | None, delta: int):
+        if view is None:
+            return
+        self.counts["total"] += delta
+        key = _TASK_COUNTERS.get(view["status"])
+        if key:
+            self.counts[key] += delta
+
+    def _refresh_list(self, name: str, path: str):
+        files = self.lists.get(name, {})
+        current = {}
+        changed = False
+        # Only team lists are claimed by track_team_tasks
+        track = (TEAMS_DIR / name).is_dir()
+        if not track:
+            self._changed.pop(name, None)
+        try:
+            with os.scandir(path) as it:
+                for de in it:
+                    if not de.name.endswith(".json"):
+                        continue
+                    try:
+                        st = de.stat()
+                    except OSError:
+                        continue
+                    sig = (st.st_mtime_ns, st.st_size)
+                    entry = files.get(de.name)
+                    _metrics.cache("taskFile", entry is not None and entry[0] == sig)
+                    if entry is None or entry[0] != sig:
+                        td = read_json(Path(de.path))
+                        view = _task_view(td, de.name[:-5]) if isinstance(td, dict) else None
+                        if entry is not None:
+                            self._count(entry[1], -1)
+                        self._count(view, 1)
+                        if view is not None and track:
+                            self._changed.setdefault(name, {})[de.name] = view
+                        entry = (sig, view)
+                        changed = True
+                    current[de.name] = entry
+        except OSError:
+            pass
+        for gone in files.keys() - current.keys():
+            self._count(files[gone][1], -1)
+            changed = True
+        self.lists[name] = current
+        if changed:
+            self._sorted.pop(name, None)
+
+    def refresh_lists(self, names: list[str]):
+        """Re-stat only the named task lists (the team ones)."""
+        for name in names:
+            path = TASKS_DIR / name
+            if path.is_dir():
+                self._refresh_list(name, str(path))
+            elif name in self.lists:
+                for _, view in self.lists.pop(name).values():
+                    self._count(view, -1)
+                self._sorted.pop(name, None)
+                self._changed.pop(name, None)
+
+    def refresh(self):
+        """Re-stat every task file and re-parse the ones that changed."""
+        seen = set()
+        try:
+            with os.scandir(TASKS_DIR) as it:
+                for de in it:
+                    if de.is_dir():
+                        seen.add(de.name)
+                        self._refresh_list(de.name, de.path)
+        except OSError:
+            pass
+        for gone in self.lists.keys() - seen:
+            for _, view in self.lists.pop(gone).values():
+                self._count(view, -1)
+            self._sorted.pop(gone, None)
+            self._changed.pop(gone, None)
+
+    def tasks(self, name: str) -> list[dict]:
+        """Tasks of one list, in-progress first, then by id."""
+        if name not in self._sorted:
+            views = [v for _, v in self.lists.get(name, {}).values() if v is not None]
+            views.sort(key=lambda t: (_TASK_ORDER.get(t["status"], 9), str(t["id"])))
+            self._sorted[name] = views
+        return self._sorted[name]
+
+    def take_changed(self, name: str) -> list[dict]:
+        """Tasks of one list parsed since the previous call."""
+        return list(self._changed.pop(name, {}).values())
+
+    def summary(self) -> dict:
+        return dict(self.counts)
+
+
+_task_store = TaskStore()
+
+
+def get_tasks_summary() -> dict:
+    return _task_store.summary()
+
+
 # ── Teams (Enhanced with inbox messages & tasks) ──
+#
+# Team configs and inboxes are cached per team directory. An inbox is
+# parsed once per (mtime, size) change into its message count, the tail
+# used for the message flow and a per-sender index of outgoing messages,
+# so a tick only stats files and merges a few short lists.
+
+FLOW_PER_INBOX = 5
+REASONING_PER_MEMBER = 6
+_REASONING_SKIP_TYPES = {
+    "idle_notification",
+    "shutdown_request",
+    "shutdown_response",
+    "plan_approval_request",
+    "plan_approval_response",
+}
+
+
+def _flow_entry(msg: dict, recipient: str) -> dict:
+    """Classify one inbox message for the team message flow."""
+    text = msg.get("text", "")
+    summary = msg.get("summary", "")
+    msg_type = "message"
+    display_text = summary or text[:120]
+    if text.startswith("{"):
+        try:
+            parsed = json.loads(text)
+            ptype = parsed.get("type", "")
+            if ptype == "idle_notification":
+                msg_type = "idle"
+                display_text = "idle"
+            elif ptype == "task_assignment":
+                msg_type = "task"
+                display_text = parsed.get("subject", "")[:100]
+            elif ptype == "shutdown_request":
+                msg_type = "shutdown"
+                display_text = "shutdown request"
+        except json.JSONDecodeError:
+            pass
+    return {
+        "from": msg.get("from", ""),
+        "to": recipient,
+        "type": msg_type,
+        "text": display_text,
+        "timestamp": msg.get("timestamp", ""),
+    }
+
+
+def _reasoning_entry(msg: dict, recipient: str) -> dict | None:
+    """Outgoing message as a reasoning line for its sender, or None to hide it."""
+    text = msg.get("text", "")
+    summary = msg.get("summary", "")
+    if text.startswith("{"):
+        try:
+            parsed = json.loads(text)
+            ptype = parsed.get("type", "")
+            if ptype in _REASONING_SKIP_TYPES:
+                return None
+            if ptype == "task_assignment":
+                summary = f"[TaskCreate] {parsed.get('subject', '')}"
+        except json.JSONDecodeError:
+            pass
+    display = summary or text[:300]
+    # Skip raw JSON that wasn't handled
+    if display.startswith("{"):
+        return None
+    return {"text": display[:300], "ts": msg.get("timestamp", ""), "to": recipient}
+
+
+class Inbox:
+    """Parsed view of one recipient's inbox file."""
+
+    __slots__ = ("sig", "mtime", "count", "flow", "by_sender")
+
+    def __init__(self, recipient: str, msgs, sig: tuple[int, int] | None, mtime_: float):
+        self.sig = sig
+        self.mtime = mtime_
+        self.count = len(msgs) if isinstance(msgs, list) else 0
+        self.flow: list[dict] = []
+        self.by_sender: dict[str, list[dict]] = {}
+        if not isinstance(msgs, list):
+            return
+        self.flow = [
+            _flow_entry(m, recipient) for m in msgs[-FLOW_PER_INBOX:] if isinstance(m, dict)
+        ]
+        for m in msgs:
+            if not isinstance(m, dict):
+                continue
+            entry = _reasoning_entry(m, recipient)
+            if entry is not None:
+                self.by_sender.setdefault(m.get("from"), []).append(entry)
+        # Only the newest few per sender can survive the merge across inboxes
+        for sender, entries in self.by_sender.items():
+            entries.sort(key=lambda r: r.get("ts", ""))
+            self.by_sender[sender] = entries[-REASONING_PER_MEMBER:]
+
+
+class TeamState:
+    """Cached config and per-recipient inbox index for one team directory."""
+
+    def __init__(self, team_dir: Path):
+        self.dir = team_dir
+        self.config: dict | None = None
+        self.config_sig: tuple[int, int] | None = None
+        self.config_mtime = 0.0
+        self.inboxes: dict[str, Inbox] = {}   # recipient -> inbox, directory order
+        self._flow: list[dict] | None = None
+        self._reasoning: dict[str, list[dict]] | None = None
+
+    def _invalidate(self):
+        self._flow = None
+        self._reasoning = None
+
+    def refresh(self):
+        """Re-read the config and any inbox whose (mtime, size) changed."""
+        cfg = self.dir / "config.json"
+        try:
+            st = cfg.stat()
+        except OSError:
+            self.config = None
+            return
+        sig = (st.st_mtime_ns, st.st_size)
+        if sig != self.config_sig:
+            self.config_sig = sig
+            self.config_mtime = st.st_mtime
+            self.config = read_json(cfg)
+        if not self.config:
+            return
+
+        with _inbox_notes_lock:
+            noted = {r: _inbox_notes.pop((t, r)) for t, r in list(_inbox_notes) if t == self.dir.name}
+        inboxes: dict[str, Inbox] = {}
+        try:
+            with os.scandir(self.dir / "inboxes") as it:
+                for de in it:
+                    if not de.name.endswith(".json"):
+                        continue
+                    try:
+                        ist = de.stat()
+                    except OSError:
+                        continue
+                    recipient = de.name[:-5]
+                    isig = (ist.st_mtime_ns, ist.st_size)
+                    cached = self.inboxes.get(recipient)
+                    _metrics.cache("inbox", cached is not None and cached.sig == isig)
+                    if cached is None or cached.sig != isig:
+                        note = noted.get(recipient)
+                        msgs = note[0] if note and note[1] == isig else read_json(Path(de.path))
+                        cached = Inbox(recipient, msgs, isig, ist.st_mtime)
+                        self._invalidate()
+                    inboxes[recipient] = cached
+        except OSError:
+            pass
+        if list(inboxes) != list(self.inboxes):
+            self._invalidate()
+        self.inboxes = inboxes
+
+    def message_flow(self) -> list[dict]:
+        if self._flow is None:
+            flow = [e for ib in self.inboxes.values() for e in ib.flow]
+            flow.sort(key=lambda m: m.get("timestamp", ""), reverse=True)
+            self._flow = flow[:20]
+        return self._flow
+
+    def reasoning(self, sender: str) -> list[dict]:
+        if self._reasoning is None:
+            merged: dict[str, list[dict]] = {}
+            for ib in self.inboxes.values():
+                for who, entries in ib.by_sender.items():
+                    merged.setdefault(who, []).extend(entries)
+            for who, entries in merged.items():
+                entries.sort(key=lambda r: r.get("ts", ""))
+                merged[who] = entries[-REASONING_PER_MEMBER:]
+            self._reasoning = merged
+        return self._reasoning.get(sender, [])
+
+
+_team_states: dict[str, TeamState] = {}   # team dir name -> cached state
+_inbox_notes: dict[tuple[str, str], tuple] = {}   # (team dir, recipient) -> (msgs, sig) we just wrote
+_inbox_notes_lock = threading.Lock()
+
+
+def note_inbox(team_dir: Path, recipient: str, msgs: list):
+    """Hand an inbox this server just wrote to the collector.
+
+    TeamState is only touched by the collector thread; the next refresh
+    takes ``msgs`` instead of re-reading the file, as long as the file still
+    has the signature it had right after the write.
+    """
+    try:
+        st = (team_dir / "inboxes" / f"{recipient}.json").stat()
+    except OSError:
+        return
+    with _inbox_notes_lock:
+        _inbox_notes[(team_dir.name, recipient)] = (msgs, (st.st_mtime_ns, st.st_size))
+
+
+def team_state(team_dir: Path) -> TeamState:
+    state = _team_states.get(team_dir.name)
+    if state is None:
+        state = _team_states[team_dir.name] = TeamState(team_dir)
+    return state
 
 
 def get_teams() -> list[dict]:
     teams = []
     if not TEAMS_DIR.exists():
+        _team_states.clear()
         return teams
 
     now = time.time()
+    seen = set()
     for team_dir in TEAMS_DIR.iterdir():
         if not team_dir.is_dir():
             continue
-        config = read_json(team_dir / "config.json")
+        state = team_state(team_dir)
+        seen.add(team_dir.name)
+        state.refresh()
+        config = state.config
         if not config:
             continue
 
         members = []
-        inboxes_dir = team_dir / "inboxes"
-
         for member in config.get("members", []):
             name = member.get("name", "unknown")
-            inbox_file = inboxes_dir / f"{name}.json" if inboxes_dir.exists() else None
-            inbox_mt = mtime(inbox_file) if inbox_file and inbox_file.exists() else 0
-            config_mt = mtime(team_dir / "config.json")
-            is_active = (now - max(inbox_mt, config_mt)) < ACTIVE_SECS
-
-            inbox_data = read_json(inbox_file) if inbox_file and inbox_file.exists() else None
-            msg_count = len(inbox_data) if isinstance(inbox_data, list) else 0
+            inbox = state.inboxes.get(name)
+            inbox_mt = inbox.mtime if inbox else 0
+            is_active = (now - max(inbox_mt, state.config_mtime)) < ACTIVE_SECS
 
             members.append({
                 "name": name,
@@ -512,90 +1794,14 @@ def get_teams() -> list[dict]:
                 "model": member.get("model", "unknown"),
                 "color": member.get("color", "gray"),
                 "active": is_active,
-                "inboxMessages": msg_count,
+                "inboxMessages": inbox.count if inbox else 0,
                 "cwd": member.get("cwd", ""),
                 "joinedAt": member.get("joinedAt", 0),
             })
 
-        # Collect message flow from all inboxes
-        message_flow = []
-        if inboxes_dir.exists():
-            for inbox_file in inboxes_dir.iterdir():
-                if inbox_file.suffix != ".json":
-                    continue
-                recipient = inbox_file.stem
-                msgs = read_json(inbox_file)
-                if not isinstance(msgs, list):
-                    continue
-                for msg in msgs[-5:]:
-                    if not isinstance(msg, dict):
-                        continue
-                    text = msg.get("text", "")
-                    summary = msg.get("summary", "")
-                    # Classify message type
-                    msg_type = "message"
-                    display_text = summary or text[:120]
-                    if text.startswith("{"):
-                        try:
-                            parsed = json.loads(text)
-                            ptype = parsed.get("type", "")
-                            if ptype == "idle_notification":
-                                msg_type = "idle"
-                                display_text = "idle"
-                            elif ptype == "task_assignment":
-                                msg_type = "task"
-                                display_text = parsed.get("subject", "")[:100]
-                            elif ptype == "shutdown_request":
-                                msg_type = "shutdown"
-                                display_text = "shutdown request"
-                        except json.JSONDecodeError:
-                            pass
-
-                    message_flow.append({
-                        "from": msg.get("from", ""),
-                        "to": recipient,
-                        "type": msg_type,
-                        "text": display_text,
-                        "timestamp": msg.get("timestamp", ""),
-                    })
-
-        message_flow.sort(key=lambda m: m.get("timestamp", ""), reverse=True)
-
-        # Load team tasks
-        team_tasks = []
-        team_task_dir = TASKS_DIR / team_dir.name
-        if team_task_dir.exists():
-            for tf in team_task_dir.glob("*.json"):
-                td = read_json(tf)
-                if isinstance(td, dict):
-                    team_tasks.append({
-                        "id": td.get("id", tf.stem),
-                        "subject": td.get("subject", "")[:80],
-                        "description": td.get("description", "")[:200],
-                        "activeForm": td.get("activeForm", ""),
-                        "status": td.get("status", ""),
-                        "owner": td.get("owner", ""),
-                        "blockedBy": [
-                            b for b in td.get("blockedBy", [])
-                            if isinstance(b, str)
-                        ],
-                    })
-            team_tasks.sort(key=lambda t: (
-                {"in_progress": 0, "pending": 1, "completed": 2}.get(t["status"], 9),
-                str(t["id"]),
-            ))
+        team_tasks = _task_store.tasks(team_dir.name)
 
         # Enrich members with task progress & reasoning from inbox msgs
-        all_inbox_msgs = {}
-        if inboxes_dir.exists():
-            for ibf in inboxes_dir.iterdir():
-                if ibf.suffix != ".json":
-                    continue
-                rcpt = ibf.stem
-                idata = read_json(ibf)
-                if isinstance(idata, list):
-                    all_inbox_msgs[rcpt] = idata
-
         for member in members:
             mname = member["name"]
             owned = [t for t in team_tasks if t.get("owner") == mname]
@@ -612,43 +1818,7 @@ def get_teams() -> list[dict]:
                 if active_t and active_t[0].get("activeForm")
                 else ""
             )
-            # Reasoning from outgoing inbox messages
-            member_reasoning = []
-            for rcpt, imsgs in all_inbox_msgs.items():
-                for imsg in imsgs:
-                    if not isinstance(imsg, dict):
-                        continue
-                    if imsg.get("from") != mname:
-                        continue
-                    itxt = imsg.get("text", "")
-                    isum = imsg.get("summary", "")
-                    if itxt.startswith("{"):
-                        try:
-                            parsed = json.loads(itxt)
-                            ptype = parsed.get("type", "")
-                            if ptype in (
-                                "idle_notification",
-                                "shutdown_request",
-                                "shutdown_response",
-                                "plan_approval_request",
-                                "plan_approval_response",
-                            ):
-                                continue
-                            if ptype == "task_assignment":
-                                isum = f"[TaskCreate] {parsed.get('subject', '')}"
-                        except json.JSONDecodeError:
-                            pass
-                    display = isum or itxt[:300]
-                    # Skip raw JSON that wasn't handled
-                    if display.startswith("{"):
-                        continue
-                    member_reasoning.append({
-                        "text": display[:300],
-                        "ts": imsg.get("timestamp", ""),
-                        "to": rcpt,
-                    })
-            member_reasoning.sort(key=lambda r: r.get("ts", ""))
-            member["reasoning"] = member_reasoning[-6:]
+            member["reasoning"] = state.reasoning(mname)
 
         lead_id = config.get("leadAgentId", "")
         lead_name = lead_id.split("@")[0] if "@" in lead_id else ""
@@ -658,51 +1828,26 @@ def get_teams() -> list[dict]:
             "description": config.get("description", ""),
             "memberCount": len(members),
             "members": members,
-            "messageFlow": message_flow[:20],
+            "messageFlow": state.message_flow(),
             "tasks": team_tasks,
             "leadName": lead_name,
             "createdAt": config.get("createdAt", 0),
         })
 
+    for gone in set(_team_states) - seen:
+        del _team_states[gone]
     return teams
 
 
-def get_tasks_summary() -> dict:
-    total = completed = in_progress = pending = 0
-    if not TASKS_DIR.exists():
-        return {"total": 0, "completed": 0, "inProgress": 0, "pending": 0}
-
-    for task_dir in TASKS_DIR.iterdir():
-        if not task_dir.is_dir():
-            continue
-        for tf in task_dir.glob("*.json"):
-            data = read_json(tf)
-            if isinstance(data, dict):
-                status = data.get("status", "")
-                total += 1
-                if status == "completed":
-                    completed += 1
-                elif status == "in_progress":
-                    in_progress += 1
-                elif status == "pending":
-                    pending += 1
-
-    return {
-        "total": total,
-        "completed": completed,
-        "inProgress": in_progress,
-        "pending": pending,
-    }
-
-
 def get_history(count: int = 15) -> list[dict]:
     if not HISTORY_FILE.exists():
         return []
 
     activities = []
     try:
-        lines = tail_lines(HISTORY_FILE, count + 5)
-        for raw in lines[-count:]:
+        lines = tail_lines(HISTORY_FILE, count + 5)[-count:]
+        _metrics.read(0, len(lines))
+        for raw in lines:
             raw = raw.strip()
             if not raw:
                 continue
@@ -724,19 +1869,749 @@ def get_history(count: int = 15) -> list[dict]:
     except Exception:
         pass
 
-    activities.reverse()
-    return activities
+    activities.reverse()
+    return activities
+
+
+# ── Session Catalog ──
+#
+# A local SQLite catalog of every session and per-message token usage, fed
+# incrementally from the project JSONL files. Each file's consumed byte
+# offset is stored alongside the rows, so ingestion resumes across restarts
+# and only ever reads appended bytes.
+
+CATALOG_FILE = CLAUDE_DIR / "monitor" / "catalog.db"
+CATALOG_ENABLED = os.environ.get("CLAUDE_MONITOR_CATALOG", "1") != "0"
+CATALOG_TICK_BYTES = 8 * 1024 * 1024   # JSONL bytes ingested per catalog tier refresh
+
+_CATALOG_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    ident TEXT NOT NULL,
+    offset INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    project TEXT NOT NULL,
+    cwd TEXT,
+    git_branch TEXT,
+    first_ts TEXT,
+    last_ts TEXT,
+    model TEXT,
+    entries INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS messages (
+    session_id TEXT NOT NULL,
+    message_id TEXT NOT NULL,
+    ts TEXT,
+    day TEXT,
+    project TEXT NOT NULL,
+    git_branch TEXT,
+    model TEXT,
+    input_tokens INTEGER NOT NULL DEFAULT 0,
+    output_tokens INTEGER NOT NULL DEFAULT 0,
+    cache_read INTEGER NOT NULL DEFAULT 0,
+    cache_create INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (session_id, message_id)
+);
+CREATE INDEX IF NOT EXISTS messages_day ON messages (day);
+CREATE INDEX IF NOT EXISTS messages_project ON messages (project, day);
+"""
+
+
+def parse_usage_lines(
+    path: str, session_id: str, project: str, offset: int, max_bytes: int
+) -> tuple[int, list[tuple], dict]:
+    """Stream complete JSONL lines from ``offset`` and extract usage rows.
+
+    Returns (new offset, message rows, session info). A trailing line without
+    a newline is left for the next call.
+    """
+    rows = []
+    info = {"cwd": None, "git_branch": None, "first_ts": None, "last_ts": None,
+            "model": None, "entries": 0}
+    with open(path, "rb") as f:
+        f.seek(offset)
+        while max_bytes > 0:
+            line = f.readline()
+            if not line.endswith(b"\n"):
+                break
+            offset += len(line)
+            max_bytes -= len(line)
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if not isinstance(entry, dict):
+                continue
+            info["entries"] += 1
+            ts = entry.get("timestamp") or None
+            if isinstance(ts, str):
+                info["first_ts"] = info["first_ts"] or ts
+                info["last_ts"] = ts
+            if entry.get("cwd"):
+                info["cwd"] = entry["cwd"]
+            if entry.get("gitBranch"):
+                info["git_branch"] = entry["gitBranch"]
+            msg = entry.get("message")
+            if entry.get("type") != "assistant" or not isinstance(msg, dict):
+                continue
+            usage = _message_usage(msg)
+            if not usage:
+                continue
+            model = msg.get("model") or None
+            if model and not model.startswith("<"):
+                info["model"] = model
+            message_id = msg.get("id") or entry.get("uuid")
+            if not message_id:
+                continue
+            rows.append((
+                session_id, message_id, ts, ts[:10] if isinstance(ts, str) else None,
+                project, entry.get("gitBranch") or None, model,
+                usage.get("input_tokens", 0) or 0,
+                usage.get("output_tokens", 0) or 0,
+                usage.get("cache_read_input_tokens", 0) or 0,
+                usage.get("cache_creation_input_tokens", 0) or 0,
+            ))
+    return offset, rows, info
+
+
+class SessionCatalog:
+    """SQLite catalog of sessions and per-message usage."""
+
+    GROUPS = {"day": "day", "project": "project", "model": "model", "branch": "git_branch"}
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.lock = threading.Lock()
+        self._db: sqlite3.Connection | None = None
+        self._offsets: dict[str, tuple[str, int]] | None = None
+
+    def _conn(self) -> sqlite3.Connection:
+        if self._db is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(self.path, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.executescript(_CATALOG_SCHEMA)
+            self._offsets = {
+                path: (ident, offset)
+                for path, ident, offset in db.execute("SELECT path, ident, offset FROM files")
+            }
+            self._db = db
+        return self._db
+
+    def _resume_offset(self, path: str, st: os.stat_result) -> int | None:
+        self._conn()
+        ident = f"{st.st_dev}:{st.st_ino}"
+        known = self._offsets.get(path)
+        if known is None or known[0] != ident or st.st_size < known[1]:
+            return 0
+        return known[1] if st.st_size > known[1] else None
+
+    def pending(self, path: str, st: os.stat_result) -> int | None:
+        """Offset to resume ``path`` from, or None when it is fully ingested."""
+        with self.lock:
+            return self._resume_offset(path, st)
+
+    def is_current(self, path: str, size: int) -> bool:
+        """True when the checkpoint for ``path`` already sits at ``size``."""
+        with self.lock:
+            self._conn()
+            known = self._offsets.get(path)
+        return known is not None and known[1] == size
+
+    def store(self, path: str, st: os.stat_result, session_id: str, project: str,
+              offset: int, rows: list[tuple], info: dict, start: int | None = None) -> bool:
+        """Write one parsed chunk and its checkpoint in a single transaction.
+
+        With ``start`` given, the chunk is only stored if the checkpoint still
+        sits where the chunk began, so concurrent feeders never double count.
+        """
+        ident = f"{st.st_dev}:{st.st_ino}"
+        with self.lock:
+            db = self._conn()
+            if start is not None and self._resume_offset(path, st) != start:
+                return False
+            with db:
+                db.executemany(
+                    "INSERT OR REPLACE INTO messages VALUES (?,?,?,?,?,?,?,?,?,?,?)", rows
+                )
+                if info["entries"]:
+                    db.execute(
+                        """
+                        INSERT INTO sessions (session_id, project, cwd, git_branch,
+                                              first_ts, last_ts, model, entries)
+                        VALUES (?,?,?,?,?,?,?,?)
+                        ON CONFLICT (session_id) DO UPDATE SET
+                            project = excluded.project,
+                            cwd = COALESCE(excluded.cwd, sessions.cwd),
+                            git_branch = COALESCE(excluded.git_branch, sessions.git_branch),
+                            first_ts = MIN(COALESCE(sessions.first_ts, excluded.first_ts),
+                                           COALESCE(excluded.first_ts, sessions.first_ts)),
+                            last_ts = MAX(COALESCE(sessions.last_ts, excluded.last_ts),
+                                          COALESCE(excluded.last_ts, sessions.last_ts)),
+                            model = COALESCE(excluded.model, sessions.model),
+                            entries = sessions.entries + excluded.entries
+                        """,
+                        (session_id, project, info["cwd"], info["git_branch"],
+                         info["first_ts"], info["last_ts"], info["model"], info["entries"]),
+                    )
+                db.execute(
+                    "INSERT OR REPLACE INTO files VALUES (?,?,?)", (path, ident, offset)
+                )
+            self._offsets[path] = (ident, offset)
+        _session_index.note_model(session_id, info["model"])
+        return True
+
+    def ingest(self, path: Path, session_id: str, project: str, max_bytes: int) -> int:
+        """Ingest appended bytes of one session file; returns bytes consumed.
+
+        The file is read without the catalog lock; only the write takes it.
+        """
+        try:
+            st = path.stat()
+        except OSError:
+            return 0
+        start = self.pending(str(path), st)
+        if start is None:
+            return 0
+        try:
+            offset, rows, info = parse_usage_lines(
+                str(path), session_id, project, start, max_bytes
+            )
+        except OSError:
+            return 0
+        if offset > start and not self.store(
+            str(path), st, session_id, project, offset, rows, info, start=start
+        ):
+            return 0
+        return offset - start
+
+    def usage(self, by: str = "day", since: str = "", until: str = "",
+              project: str = "", model: str = "") -> list[dict]:
+        col = self.GROUPS.get(by, "day")
+        where, args = [], []
+        if since:
+            where.append("day >= ?")
+            args.append(since)
+        if until:
+            where.append("day <= ?")
+            args.append(until)
+        if project:
+            where.append("project = ?")
+            args.append(project)
+        if model:
+            where.append("model = ?")
+            args.append(model)
+        sql = f"""
+            SELECT {col}, COUNT(*), COUNT(DISTINCT session_id),
+                   SUM(input_tokens), SUM(output_tokens), SUM(cache_read), SUM(cache_create)
+            FROM messages {"WHERE " + " AND ".join(where) if where else ""}
+            GROUP BY {col} ORDER BY {col}
+        """
+        with self.lock:
+            rows = self._conn().execute(sql, args).fetchall()
+        return [
+            {
+                "key": key or "",
+                "messages": n,
+                "sessions": sessions,
+                "inputTokens": it or 0,
+                "outputTokens": ot or 0,
+                "cacheRead": cr or 0,
+                "cacheCreate": cc or 0,
+            }
+            for key, n, sessions, it, ot, cr, cc in rows
+        ]
+
+    def models(self) -> dict[str, str]:
+        with self.lock:
+            rows = self._conn().execute(
+                "SELECT session_id, model FROM sessions WHERE model IS NOT NULL"
+            ).fetchall()
+        return dict(rows)
+
+    def sessions(self, project: str = "", limit: int = 50) -> list[dict]:
+        sql = """
+            SELECT s.session_id, s.project, s.cwd, s.git_branch, s.first_ts, s.last_ts,
+                   s.model, s.entries, COUNT(m.message_id),
+                   SUM(m.input_tokens), SUM(m.output_tokens),
+                   SUM(m.cache_read), SUM(m.cache_create)
+            FROM sessions s LEFT JOIN messages m ON m.session_id = s.session_id
+            WHERE (? = '' OR s.project = ?)
+            GROUP BY s.session_id ORDER BY s.last_ts DESC LIMIT ?
+        """
+        with self.lock:
+            rows = self._conn().execute(sql, (project, project, limit)).fetchall()
+        return [
+            {
+                "sessionId": sid,
+                "project": proj,
+                "cwd": cwd or "",
+                "gitBranch": branch or "",
+                "firstTs": first or "",
+                "lastTs": last or "",
+                "model": model or "",
+                "entries": entries,
+                "messages": n,
+                "inputTokens": it or 0,
+                "outputTokens": ot or 0,
+                "cacheRead": cr or 0,
+                "cacheCreate": cc or 0,
+            }
+            for sid, proj, cwd, branch, first, last, model, entries, n, it, ot, cr, cc in rows
+        ]
+
+
+_catalog = SessionCatalog(CATALOG_FILE)
+
+
+def catalog_sync(max_bytes: int = CATALOG_TICK_BYTES):
+    """Feed sessions the scanner saw grow into the catalog, up to ``max_bytes``.
+
+    Runs after a collector tick on the "catalog" refresh tier, and is put off
+    while that tick ran over its time budget (up to the tier's staleness budget).
+    """
+    if not CATALOG_ENABLED or _backfill.get("state") == "running":
+        return
+    now = time.time()
+    if not _schedule.due("catalog", now):
+        return
+    _schedule.mark("catalog", now)
+    with _stage("catalog_sync"):
+        try:
+            for name, scan in list(_project_scans.items()):
+                for sid, rec in list(scan.files.items()):
+                    path = scan.dir / f"{sid}.jsonl"
+                    if _catalog.is_current(str(path), rec[1]):
+                        continue
+                    consumed = _catalog.ingest(path, sid, name, max_bytes)
+                    _metrics.read(consumed)
+                    max_bytes -= consumed
+                    if max_bytes <= 0:
+                        return
+        except sqlite3.Error:
+            return
+
+
+# ── Catalog Backfill ──
+#
+# Full-history ingestion for the catalog: session files are split into
+# chunks parsed line by line in a process pool. Every chunk is stored
+# together with its byte-offset checkpoint, so an interrupted backfill
+# resumes where it stopped and later runs only read new bytes.
+
+BACKFILL_CHUNK_BYTES = 32 * 1024 * 1024
+
+_backfill: dict = {"state": "idle"}
+_backfill_lock = threading.Lock()
+
+
+def backfill_status() -> dict:
+    status = dict(_backfill)
+    if "startedAt" in status:
+        elapsed = (status.get("finishedAt") or time.time()) - status["startedAt"]
+        status["elapsedSecs"] = round(elapsed, 1)
+        status["mbPerSec"] = round(status["bytesDone"] / 1e6 / elapsed, 2) if elapsed > 0 else 0.0
+        total = status["bytesTotal"]
+        status["percent"] = round(100 * status["bytesDone"] / total, 1) if total else 100.0
+    return status
+
+
+def run_backfill(workers: int | None = None) -> dict:
+    """Ingest every session file's unread bytes into the catalog."""
+    with _backfill_lock:
+        if _backfill.get("state") == "running":
+            return backfill_status()
+        _backfill.clear()
+        _backfill.update({
+            "state": "running",
+            "workers": workers or os.cpu_count() or 1,
+            "startedAt": time.time(),
+            "finishedAt": None,
+            "files": 0,
+            "filesDone": 0,
+            "filesFailed": 0,
+            "bytesTotal": 0,
+            "bytesDone": 0,
+            "error": None,
+        })
+    try:
+        plan = []
+        for project, path, st in _iter_session_files():
+            path, sid = Path(path), os.path.basename(path)[:-6]
+            start = _catalog.pending(str(path), st)
+            if start is not None:
+                plan.append((path, sid, project, st, start))
+        _backfill["files"] = len(plan)
+        _backfill["bytesTotal"] = sum(st.st_size - start for *_, st, start in plan)
+
+        # Spawn, not fork: this runs on a thread of a multithreaded server, and a
+        # forked child could inherit locks (catalog, logging) held by other threads
+        spawn = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=_backfill["workers"], mp_context=spawn) as pool:
+            pending = {}
+
+            def submit(item, start):
+                path, sid, project, _, _ = item
+                fut = pool.submit(
+                    parse_usage_lines, str(path), sid, project, start, BACKFILL_CHUNK_BYTES
+                )
+                pending[fut] = (item, start)
+
+            for item in plan:
+                submit(item, item[4])
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    item, start = pending.pop(fut)
+                    path, sid, project, st, _ = item
+                    try:
+                        offset, rows, info = fut.result()
+                    except Exception as e:
+                        _backfill["filesFailed"] += 1
+                        _backfill["error"] = f"{path.name}: {e}"
+                        continue
+                    if offset > start:
+                        stored = _catalog.store(
+                            str(path), st, sid, project, offset, rows, info, start=start
+                        )
+                        if not stored:
+                            _backfill["filesDone"] += 1
+                            continue
+                        _backfill["bytesDone"] += offset - start
+                    if offset - start >= BACKFILL_CHUNK_BYTES:
+                        submit(item, offset)
+                    else:
+                        _backfill["filesDone"] += 1
+        _backfill["state"] = "done"
+    except Exception as e:
+        _backfill["state"] = "error"
+        _backfill["error"] = str(e)
+    finally:
+        _backfill["finishedAt"] = time.time()
+    return backfill_status()
+
+
+# ── File Watcher ──
+
+WATCH_ENABLED = os.environ.get("CLAUDE_MONITOR_WATCH", "1") != "0"
+WATCH_DEBOUNCE_MS = 150
+
+_watch_lock = threading.Lock()
+_watch_roots: set[Path] = set()               # roots currently under watch
+_watch_projects: dict[str, set[str]] = {}     # project dirName ("" = root) -> changed names
+_watch_sections: set[str] = set()             # other sections touched since last tick
+_section_cache: dict[str, object] = {}
+_refresh_event: asyncio.Event | None = None
+
+
+def _note_fs_changes(changes: set[tuple]):
+    """Classify a debounced watchfiles batch into projects and sections."""
+    with _watch_lock:
+        for _, raw in changes:
+            path = Path(raw)
+            try:
+                parts = path.relative_to(PROJECTS_DIR).parts
+            except ValueError:
+                parts = None
+            if parts is not None:
+                if len(parts) == 1:
+                    _watch_projects.setdefault("", set()).add(parts[0])
+                elif len(parts) == 2:
+                    _watch_projects.setdefault(parts[0], set()).add(parts[1])
+                continue
+            if path == STATS_FILE:
+                _watch_sections.add("stats")
+            elif path == HISTORY_FILE:
+                _watch_sections.add("history")
+            elif TASKS_DIR in path.parents:
+                _watch_sections.add("tasks")
+            elif TEAMS_DIR in path.parents:
+                _watch_sections.add("teams")
+
+
+def take_watch_changes() -> tuple[dict[str, set[str]] | None, set[str]]:
+    """Swap out pending watcher changes.
+
+    Returns (project changes, dirty sections). Project changes are None when
+    the projects tree is not covered by the watcher and must be polled this
+    tick; sections outside the watch simply follow their refresh tier. The
+    "idleProjects" tier doubles as a periodic full pass while the watcher runs.
+    """
+    global _watch_projects, _watch_sections
+    with _watch_lock:
+        projects, sections = _watch_projects, _watch_sections
+        _watch_projects, _watch_sections = {}, set()
+        roots = set(_watch_roots)
+    if PROJECTS_DIR not in roots:
+        projects = None
+    return projects, sections
+
+
+def _section(name: str, dirty: set[str], compute):
+    """Return a cached section result unless it is dirty or its refresh tier is due."""
+    now = time.time()
+    fresh = name not in _section_cache or _schedule.due(name, now, name in dirty)
+    _metrics.cache("section", not fresh)
+    if fresh:
+        with _stage(f"get_{name}"):
+            _section_cache[name] = compute()
+        _schedule.mark(name, now)
+    return _section_cache[name]
+
+
+async def _watch_paths(paths: list[Path], recursive: bool, names: set[str] | None = None):
+    watch_filter = (lambda _, p: Path(p).name in names) if names else None
+    async for batch in awatch(
+        *paths,
+        watch_filter=watch_filter,
+        debounce=WATCH_DEBOUNCE_MS,
+        step=50,
+        recursive=recursive,
+    ):
+        _note_fs_changes(batch)
+        if _refresh_event is not None:
+            _refresh_event.set()
+
+
+async def _watch_loop():
+    """Push filesystem changes to the collector; polling covers anything unwatched."""
+    if awatch is None or not WATCH_ENABLED:
+        return
+    trees = [p for p in (PROJECTS_DIR, TEAMS_DIR, TASKS_DIR) if p.is_dir()]
+    # history.jsonl and stats-cache.json may be replaced by rename, so watch
+    # their parent (non-recursively) rather than the files themselves
+    files = {p.name for p in (HISTORY_FILE, STATS_FILE)}
+    watchers = []
+    if trees:
+        watchers.append(_watch_paths(trees, recursive=True))
+    if CLAUDE_DIR.is_dir():
+        watchers.append(_watch_paths([CLAUDE_DIR], recursive=False, names=files))
+        trees.append(CLAUDE_DIR)
+    if not watchers:
+        return
+    with _watch_lock:
+        _watch_roots.update(trees)
+    _schedule.force()   # resync everything once the watch is in place
+    try:
+        await asyncio.gather(*watchers)
+    except Exception:
+        pass
+    finally:
+        with _watch_lock:
+            _watch_roots.clear()
+
+
+# ── Collect All ──
+
+# Wall-clock budget for one snapshot; once exceeded, session tail reads and
+# agent reasoning are skipped for the tick and last known values are kept.
+COLLECT_BUDGET_SECS = float(os.environ.get("CLAUDE_MONITOR_BUDGET_SECS", "1.5"))
+
+_tick_deadline = float("inf")
+_tick_skipped: set[str] = set()
+_tick_tail_reads = 0                   # at least one tail is read per tick, budget or not
+_member_reasoning: dict[tuple[str, str], list] = {}   # last reasoning per (team, member)
+
+
+def over_budget(part: str) -> bool:
+    """True when the current tick ran past its budget; records ``part`` as skipped."""
+    if time.monotonic() < _tick_deadline:
+        return False
+    _tick_skipped.add(part)
+    return True
+
+
+def _stage(name: str):
+    """Time one collect_all() stage into the collect_stage_seconds histogram."""
+    return _metrics.timed("collect_stage_seconds", stage=name)
+
+
+def claim_tail_read() -> bool:
+    """Allow a session tail read this tick; the first one always goes through.
+
+    Once active session detail is past its staleness budget the time budget
+    no longer holds reads back.
+    """
+    global _tick_tail_reads
+    if _tick_tail_reads and not _schedule.stale("activeSessions", time.time()) and over_budget("sessionDetail"):
+        return False
+    _tick_tail_reads += 1
+    return True
+
+
+# Top-level snapshot sections a /ws client can subscribe to; "timestamp",
+# "recording" and "skipped" are small and always included
+SNAPSHOT_SECTIONS = ("summary", "projects", "stats", "teams", "tasks", "history")
+
+_projects_partial = True               # last tick refreshed only some projects, or none
+_UPDATED_SOURCES = {                   # snapshot section -> source its updatedAt follows
+    "summary": "recentSessions",
+    "projects": "recentSessions",
+    "stats": "stats",
+    "teams": "teams",
+    "tasks": "tasks",
+    "history": "history",
+}
+_deferred_sections: set[str] = set()   # dirty sections nobody subscribed to yet
+
+
+def _team_dir_names() -> list[str]:
+    try:
+        with os.scandir(TEAMS_DIR) as it:
+            return [de.name for de in it if de.is_dir()]
+    except OSError:
+        return []
+
+
+def _member_project_dirs(teams: list[dict]) -> set[str]:
+    """Project directory names of team member working directories."""
+    return {
+        re.sub(r"[^A-Za-z0-9]", "-", m["cwd"])
+        for team in teams for m in team.get("members", []) if m.get("cwd")
+    }
 
 
-# ── Collect All ──
+def refresh_projects(names: set[str]) -> list[dict]:
+    """Refresh only the named project directories, without listing the rest."""
+    now = time.time()
+    projects = []
+    recent = _schedule.due("recentSessions", now)
+    for name in sorted(names):
+        project_dir = PROJECTS_DIR / name
+        try:
+            dir_mtime = project_dir.stat().st_mtime_ns
+        except OSError:
+            continue
+        scan = _project_scans.get(name)
+        if scan is None:
+            scan = _project_scans[name] = ProjectScan(project_dir)
+        projects.append(scan.refresh(now, dir_mtime, recent=recent))
+    if recent and projects:
+        _schedule.mark("recentSessions", now)
+    return projects
+
+
+def collect_all(sections: set[str] | None = None, project_names: set[str] | None = None) -> dict:
+    """Collect the snapshot sections subscribers need; None means all of them.
+
+    ``project_names`` limits the project scan to those directories unless the
+    summary or an unfiltered project list is wanted. Each source is only
+    refreshed when its tier in REFRESH_TIERS is due (see RefreshSchedule).
+    Watcher changes for parts that are skipped are carried over, so they are
+    picked up once a subscriber asks for them again.
+    """
+    global _tick_deadline, _tick_tail_reads, _projects_partial
+    _tick_deadline = time.monotonic() + COLLECT_BUDGET_SECS
+    _tick_skipped.clear()
+    _tick_tail_reads = 0
+    now = time.time()
+    started = time.perf_counter()
+    read_bytes, parsed_lines = _metrics.read_bytes, _metrics.parsed_lines
+    want = set(SNAPSHOT_SECTIONS) if sections is None else set(sections)
+
+    project_changes, dirty = take_watch_changes()
+    dirty |= _deferred_sections
+    _deferred_sections.clear()
+    for name in dirty & {"stats", "history", "tasks", "teams"}:
+        if name not in want and (name != "tasks" or "teams" not in want):
+            _deferred_sections.add(name)
+
+    fresh_teams = "teams" in want and (
+        "teams" not in _section_cache
+        or _schedule.due("teams", now, bool(dirty & {"teams", "tasks"}))
+    )
+    # Team task lists follow the teams tier; the rest only feed the global
+    # tasks summary and follow the slower tasks tier
+    if want & {"teams", "tasks"} and _schedule.due("tasks", now, "tasks" in dirty):
+        with _stage("refresh_tasks"):
+            _task_store.refresh()
+        _schedule.mark("tasks", now)
+    elif fresh_teams:
+        with _stage("refresh_tasks"):
+            _task_store.refresh_lists(_team_dir_names())
+    teams: list[dict] = []
+    if "teams" in want:
+        _metrics.cache("teams", not fresh_teams)
+        if fresh_teams:
+            with _stage("get_teams"):
+                teams = get_teams()
+            with _stage("track_team_tasks"):
+                track_team_tasks(teams)
+        else:
+            teams = _section_cache["teams"]
+
+    # Recording capture walks the scanned sessions, so it needs every project
+    if "summary" in want or _recording_active or ("projects" in want and project_names is None):
+        with _stage("get_all_projects"):
+            projects = get_all_projects(None if _projects_partial else project_changes)
+        _projects_partial = False
+    else:
+        names = set(project_names or ()) if "projects" in want else set()
+        if "teams" in want:
+            names |= _member_project_dirs(teams)
+        with _stage("refresh_projects"):
+            projects = refresh_projects(names)
+        _projects_partial = True
+
+    if fresh_teams:
+        with _stage("reasoning"):
+            _enrich_team_reasoning(teams, projects)
+        _section_cache["teams"] = teams
+        _schedule.mark("teams", now)
+    if "sessionDetail" not in _tick_skipped:
+        _schedule.mark("activeSessions", now)
 
+    # Capture sessions if recording is active
+    capture_sessions_if_active(projects)
+
+    data = {"timestamp": datetime.now(tz=timezone.utc).isoformat()}
+    if "summary" in want:
+        data["summary"] = {
+            "totalProjects": len(projects),
+            "activeProjects": sum(1 for p in projects if p["hasActive"]),
+            "totalActiveSessions": sum(p["activeSessions"] for p in projects),
+            "totalRecentSessions": sum(p["recentSessions"] for p in projects),
+        }
+    if "projects" in want:
+        data["projects"] = projects
+    if "stats" in want:
+        data["stats"] = _section("stats", dirty, get_stats)
+    if "teams" in want:
+        data["teams"] = teams
+    if "tasks" in want:
+        with _stage("get_tasks_summary"):
+            data["tasks"] = get_tasks_summary()
+    if "history" in want:
+        data["history"] = _section("history", dirty, lambda: get_history(15))
+    # When each section was last refreshed, so clients can show how fresh it
+    # is; active sessions in "projects" are refreshed every tick on top of that
+    updated = _schedule.updated
+    data["updatedAt"] = {
+        name: round(updated[source], 3)
+        for name, source in _UPDATED_SOURCES.items()
+        if name in want and source in updated
+    }
+    data["recording"] = {
+        "active": _recording_active,
+        "id": _recording_id,
+        "startTime": _recording_meta.get("startTime") if _recording_active else None,
+        "capturedSessions": _recording_meta.get("capturedSessions", 0) if _recording_active else 0,
+        "capturedEntries": _recording_meta.get("capturedEntries", 0) if _recording_active else 0,
+    }
+    # Parts left stale this tick because collection ran over budget
+    data["skipped"] = sorted(_tick_skipped)
 
-def collect_all() -> dict:
-    projects = get_all_projects()
-    teams = get_teams()
-    track_team_tasks(teams)
+    _metrics.observe("collect_seconds", time.perf_counter() - started)
+    _metrics.observe("tick_read_bytes", _metrics.read_bytes - read_bytes, SIZE_BUCKETS)
+    _metrics.observe("tick_parsed_lines", _metrics.parsed_lines - parsed_lines, COUNT_BUCKETS)
+    return data
 
-    # Enrich team members with session-based reasoning
+
+def _enrich_team_reasoning(teams: list[dict], projects: list[dict]):
+    """Attach the reasoning of each member's active session to the member."""
     sess_by_cwd: dict[str, list] = {}
     for proj in projects:
         proj_path = proj.get("path", "").replace("\\", "/").rstrip("/").lower()
@@ -760,39 +2635,216 @@ def collect_all() -> dict:
                 continue
             matches = sess_by_cwd.get(mcwd, [])
             if matches:
+                key = (team.get("name", ""), member.get("name", ""))
+                if over_budget("reasoning"):
+                    if key in _member_reasoning:
+                        member["sessionReasoning"] = _member_reasoning[key]
+                    continue
                 best = matches[0]
                 jp = PROJECTS_DIR / best["dirName"] / (best["fullId"] + ".jsonl")
                 if jp.exists():
                     member["sessionReasoning"] = get_agent_reasoning(jp, 6)
+                    _member_reasoning[key] = member["sessionReasoning"]
+
+
+# ── Raw Capture Storage ──
+#
+# Captured transcript lines are stored as a series of independently
+# compressed frames (zstd when installed, gzip otherwise) appended to
+# raw/<project>_<session>.jsonl.zst|.gz. A sidecar .idx file holds one
+# JSON line per frame with its byte offset, length, line count and
+# timestamp range, so readers can seek to a time range and decompress
+# only the frames that overlap it. Plain .jsonl captures from older
+# versions are still read; `python server.py migrate-recordings`
+# converts them.
+
+RAW_FRAME_BYTES = 256 * 1024   # uncompressed bytes per frame
+RAW_FRAME_SECS = 30            # flush a partial frame after this long
+RAW_CODEC = "zstd" if zstandard else "gzip"
+_RAW_SUFFIXES = {".jsonl.zst": "zstd", ".jsonl.gz": "gzip", ".jsonl": None}
+_CODEC_SUFFIX = {"zstd": ".jsonl.zst", "gzip": ".jsonl.gz"}
+_TS_RE = re.compile(rb'"timestamp":\s*"([^"]+)"')
+
+
+def _raw_codec(path: Path) -> tuple[str, str | None]:
+    """(session id, codec) of a raw capture file; codec None for plain JSONL."""
+    name = path.name
+    for suffix, codec in _RAW_SUFFIXES.items():
+        if name.endswith(suffix):
+            return name[: -len(suffix)], codec
+    return path.stem, None
+
+
+def _compress_frame(codec: str, data: bytes) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    co = zlib.compressobj(6, zlib.DEFLATED, 31)   # one gzip member
+    return co.compress(data) + co.flush()
+
+
+def _decompress_frame(codec: str, data: bytes) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdDecompressor().decompress(data)
+    return zlib.decompress(data, 31)
+
+
+def _stream_reader(codec: str, fh):
+    """Binary reader decompressing every frame from the current position."""
+    if codec == "zstd":
+        return io.BufferedReader(
+            zstandard.ZstdDecompressor().stream_reader(fh, read_across_frames=True)
+        )
+    return gzip.GzipFile(fileobj=fh)
 
-    # Capture sessions if recording is active
-    capture_sessions_if_active()
 
-    total_active = sum(p["activeSessions"] for p in projects)
-    total_recent = sum(p["recentSessions"] for p in projects)
-    active_projects = sum(1 for p in projects if p["hasActive"])
+def _read_index(path: Path) -> list[dict]:
+    frames = []
+    try:
+        with open(str(path) + ".idx", "rb") as fh:
+            for line in fh:
+                try:
+                    frames.append(json.loads(line))
+                except json.JSONDecodeError:
+                    break   # torn last write: frames past it are streamed
+    except OSError:
+        pass
+    return frames
+
+
+class RawWriter:
+    """Buffers captured lines for one raw file and appends them as frames."""
+
+    def __init__(self, path: Path, codec: str = RAW_CODEC):
+        self.path = path
+        self.codec = codec
+        self.buf = bytearray()
+        self.lines = 0
+        self.since = 0.0
+
+    def add(self, data: bytes, lines: int):
+        if not self.buf:
+            self.since = time.monotonic()
+        self.buf += data
+        self.lines += lines
+        if len(self.buf) >= RAW_FRAME_BYTES:
+            self.flush()
+
+    def due(self, now: float) -> bool:
+        return bool(self.buf) and now - self.since >= RAW_FRAME_SECS
+
+    def flush(self, fh=None):
+        """Compress the buffer into one frame and record it in the index."""
+        if not self.buf:
+            return
+        data = bytes(self.buf)
+        stamps = _TS_RE.findall(data)
+        frame = _compress_frame(self.codec, data)
+        out = fh or _recording_handle(self.path)
+        out.seek(0, 2)
+        offset = out.tell()
+        out.write(frame)
+        out.flush()
+        entry = {
+            "offset": offset,
+            "length": len(frame),
+            "lines": self.lines,
+            "first": min(stamps).decode() if stamps else "",
+            "last": max(stamps).decode() if stamps else "",
+        }
+        with open(str(self.path) + ".idx", "a", encoding="utf-8") as idx:
+            idx.write(json.dumps(entry) + "\n")
+        self.buf.clear()
+        self.lines = 0
+
+
+def raw_sessions(raw_dir: Path) -> list[tuple[str, list[Path]]]:
+    """Raw capture files grouped by session, plain JSONL before compressed."""
+    groups: dict[str, list[Path]] = {}
+    for f in raw_dir.iterdir():
+        if f.name.endswith(tuple(_RAW_SUFFIXES)) and not f.name.startswith("."):
+            groups.setdefault(_raw_codec(f)[0], []).append(f)
+    return [
+        (sid, sorted(paths, key=lambda p: _raw_codec(p)[1] is not None))
+        for sid, paths in sorted(groups.items())
+    ]
+
+
+def iter_raw_lines(raw_file: Path, since: str = "", until: str = ""):
+    """Yield the non-empty lines of a raw capture.
+
+    For compressed captures, ``since``/``until`` (ISO timestamps) skip
+    frames entirely outside the range without decompressing them; frames
+    that overlap are yielded whole.
+    """
+    _, codec = _raw_codec(raw_file)
+    with open(raw_file, "rb") as fh:
+        if codec is None:
+            blocks = [fh]
+        else:
+            blocks = []
+            end = 0
+            for frame in _read_index(raw_file):
+                end = frame["offset"] + frame["length"]
+                if since and frame["last"] and frame["last"] < since:
+                    continue
+                if until and frame["first"] and frame["first"] > until:
+                    continue
+                fh.seek(frame["offset"])
+                blocks.append(io.BytesIO(_decompress_frame(codec, fh.read(frame["length"]))))
+            if end < os.fstat(fh.fileno()).st_size:
+                # Frames written after the last index entry: stream them
+                fh.seek(end)
+                blocks.append(_stream_reader(codec, fh))
+        for block in blocks:
+            for raw in block:
+                line = raw.decode("utf-8", errors="replace").strip()
+                if line:
+                    yield line
+
+
+def migrate_recording(rid: str, codec: str = RAW_CODEC) -> dict:
+    """Convert plain JSONL raw captures of one recording to compressed frames."""
+    raw_dir = _recording_dir(rid) / "raw"
+    converted = before = after = 0
+    if not raw_dir.is_dir():
+        return {"id": rid, "converted": 0}
+    for src in sorted(raw_dir.glob("*.jsonl")):
+        dst = raw_dir / (src.stem + _CODEC_SUFFIX[codec])
+        if dst.exists():
+            continue   # already has compressed frames; leave both to be read
+        tmp = dst.with_name("." + dst.name)   # hidden until verified
+        writer = RawWriter(tmp, codec)
+        lines = 0
+        with open(src, "rb") as fin, open(tmp, "wb") as fout:
+            for raw in fin:
+                writer.buf += raw
+                writer.lines += 1
+                lines += raw.strip() != b""
+                if len(writer.buf) >= RAW_FRAME_BYTES:
+                    writer.flush(fout)
+            writer.flush(fout)
+        if sum(1 for _ in iter_raw_lines(tmp)) != lines:
+            tmp.unlink(missing_ok=True)
+            Path(str(tmp) + ".idx").unlink(missing_ok=True)
+            continue
+        os.replace(str(tmp) + ".idx", str(dst) + ".idx")
+        os.replace(tmp, dst)
+        before += src.stat().st_size
+        after += dst.stat().st_size
+        src.unlink()
+        converted += 1
+    return {"id": rid, "converted": converted, "bytesBefore": before, "bytesAfter": after}
+
 
-    return {
-        "timestamp": datetime.now(tz=timezone.utc).isoformat(),
-        "summary": {
-            "totalProjects": len(projects),
-            "activeProjects": active_projects,
-            "totalActiveSessions": total_active,
-            "totalRecentSessions": total_recent,
-        },
-        "projects": projects,
-        "stats": get_stats(),
-        "teams": teams,
-        "tasks": get_tasks_summary(),
-        "history": get_history(15),
-        "recording": {
-            "active": _recording_active,
-            "id": _recording_id,
-            "startTime": _recording_meta.get("startTime") if _recording_active else None,
-            "capturedSessions": _recording_meta.get("capturedSessions", 0) if _recording_active else 0,
-            "capturedEntries": _recording_meta.get("capturedEntries", 0) if _recording_active else 0,
-        },
-    }
+def migrate_recordings() -> list[dict]:
+    if not RECORDING_DIR.is_dir():
+        return []
+    with _recording_lock:
+        return [
+            migrate_recording(d.name)
+            for d in sorted(RECORDING_DIR.iterdir())
+            if d.is_dir() and d.name != _recording_id
+        ]
 
 
 # ── Recording Engine ──
@@ -815,21 +2867,30 @@ def _load_recording_meta(rid: str) -> dict | None:
     return read_json(p)
 
 
+RECORDING_MAX_HANDLES = 32
+
+
 def start_recording() -> str:
+    with _recording_lock:
+        return _start_recording()
+
+
+def _file_ident(st: os.stat_result) -> tuple[int, int]:
+    return st.st_dev, st.st_ino
+
+
+def _start_recording() -> str:
     global _recording_active, _recording_id, _recording_meta, _recording_offsets
+    global _recording_sessions
     rid = str(uuid.uuid4())[:8]
     _recording_active = True
     _recording_id = rid
     _recording_offsets = {}
+    _recording_sessions = set()
 
     # Snapshot current byte offsets for all JSONL files
-    if PROJECTS_DIR.exists():
-        for project_dir in PROJECTS_DIR.iterdir():
-            if not project_dir.is_dir():
-                continue
-            for f in project_dir.iterdir():
-                if f.suffix == ".jsonl":
-                    _recording_offsets[str(f)] = fsize(f)
+    for _, path, st in _iter_session_files():
+        _recording_offsets[path] = (_file_ident(st), st.st_size)
 
     _recording_meta = {
         "id": rid,
@@ -848,11 +2909,20 @@ def start_recording() -> str:
 
 
 def stop_recording() -> dict:
+    with _recording_lock:
+        return _stop_recording()
+
+
+def _stop_recording() -> dict:
     global _recording_active, _recording_id, _recording_meta, _recording_offsets
+    global _recording_sessions
     if not _recording_active or not _recording_id:
         return {"error": "not recording"}
-    # Final capture
+    # Final capture over every file, not just the ones the scanner saw change
     _do_capture()
+    _flush_recording_writers(force=True)
+    _recording_writers.clear()
+    _close_recording_handles()
     _recording_meta["endTime"] = datetime.now(tz=timezone.utc).isoformat()
     _recording_meta["status"] = "completed"
     _save_recording_meta(_recording_id, _recording_meta)
@@ -861,83 +2931,187 @@ def stop_recording() -> dict:
     _recording_id = None
     _recording_meta = {}
     _recording_offsets = {}
+    _recording_sessions = set()
     return result
 
 
-def _do_capture():
-    """Read new bytes from all session JSONL files since last offset."""
-    global _recording_offsets, _recording_meta
-    if not _recording_active or not _recording_id:
-        return
-    rid = _recording_id
-    raw_dir = _recording_dir(rid) / "raw"
-    captured_sessions = set()
-    total_new = 0
+def _recording_handle(path: Path):
+    """Append handle for a raw file, kept open in a small LRU pool."""
+    key = str(path)
+    fh = _recording_handles.pop(key, None)
+    if fh is None:
+        fh = open(path, "ab")
+        while len(_recording_handles) >= RECORDING_MAX_HANDLES:
+            _recording_handles.pop(next(iter(_recording_handles))).close()
+    _recording_handles[key] = fh
+    return fh
 
-    if not PROJECTS_DIR.exists():
-        return
 
-    for project_dir in PROJECTS_DIR.iterdir():
-        if not project_dir.is_dir():
-            continue
-        for f in project_dir.iterdir():
-            if f.suffix != ".jsonl":
-                continue
-            key = str(f)
-            old_offset = _recording_offsets.get(key, 0)
-            current_size = fsize(f)
-            if current_size <= old_offset:
-                continue
-            # Read new bytes
-            try:
-                with open(f, "rb") as fh:
-                    fh.seek(old_offset)
-                    new_data = fh.read(current_size - old_offset)
-            except Exception:
-                continue
+def _close_recording_handles():
+    for fh in _recording_handles.values():
+        try:
+            fh.close()
+        except Exception:
+            pass
+    _recording_handles.clear()
+
+
+def _capture_file(raw_dir: Path, project: str, path: str, st: os.stat_result) -> int:
+    """Copy complete new lines of one session file; returns entries captured."""
+    ident = _file_ident(st)
+    known_ident, old_offset = _recording_offsets.get(path, (ident, 0))
+    if known_ident != ident or st.st_size < old_offset:
+        # Rotated or truncated: the file we had an offset into is gone
+        old_offset = 0
+    if st.st_size <= old_offset:
+        _recording_offsets[path] = (ident, old_offset)
+        return 0
+    try:
+        with open(path, "rb") as fh:
+            fh.seek(old_offset)
+            new_data = fh.read(st.st_size - old_offset)
+    except Exception:
+        return 0
+    _metrics.read(len(new_data))
 
-            if not new_data.strip():
-                continue
+    # Avoid cutting in the middle of a UTF-8 char or a JSON line:
+    # only consume up to the last newline, retry the rest next cycle
+    last_nl = new_data.rfind(b"\n")
+    if last_nl == -1:
+        return 0
+    complete_data = new_data[: last_nl + 1]
+    _recording_offsets[path] = (ident, old_offset + len(complete_data))
+    if not complete_data.strip():
+        return 0
 
-            # Avoid cutting in the middle of a UTF-8 char or a JSON line:
-            # Find the last newline and only consume up to there
-            last_nl = new_data.rfind(b"\n")
-            if last_nl == -1:
-                # No complete line yet, skip and retry next cycle
-                continue
-            complete_data = new_data[: last_nl + 1]
-            _recording_offsets[key] = old_offset + len(complete_data)
+    stem = os.path.basename(path)[:-6]
+    lines = sum(1 for line in complete_data.split(b"\n") if line.strip())
+    raw_path = raw_dir / f"{project}_{stem}{_CODEC_SUFFIX[RAW_CODEC]}"
+    writer = _recording_writers.get(str(raw_path))
+    if writer is None:
+        writer = _recording_writers[str(raw_path)] = RawWriter(raw_path)
+    try:
+        writer.add(complete_data, complete_data.count(b"\n"))
+    except Exception:
+        return 0
+    _recording_sessions.add(stem[:8])
+    return lines
 
-            # Write to raw file
-            safe_name = project_dir.name + "_" + f.stem + ".jsonl"
-            raw_file = raw_dir / safe_name
+
+def _flush_recording_writers(force: bool = False):
+    now = time.monotonic()
+    for writer in _recording_writers.values():
+        if force or writer.due(now):
             try:
-                with open(raw_file, "ab") as out:
-                    out.write(complete_data)
+                writer.flush()
             except Exception:
-                continue
+                pass
 
-            lines = complete_data.decode("utf-8", errors="replace").strip().split("\n")
-            total_new += len([l for l in lines if l.strip()])
-            captured_sessions.add(f.stem[:8])
 
-    _recording_meta["capturedSessions"] = max(
-        _recording_meta.get("capturedSessions", 0), len(captured_sessions)
-    )
-    _recording_meta["capturedEntries"] = (
-        _recording_meta.get("capturedEntries", 0) + total_new
-    )
-    _save_recording_meta(rid, _recording_meta)
+def _do_capture(projects: list[dict] | None = None):
+    """Copy new bytes of session JSONL files into the recording.
+
+    With ``projects`` (the collector's scan), only sessions whose size moved
+    past their offset are read; without it every file is stat'ed.
+    """
+    if not _recording_active or not _recording_id:
+        return
+    rid = _recording_id
+    raw_dir = _recording_dir(rid) / "raw"
+    total_new = 0
+
+    if projects is None:
+        for project, path, st in _iter_session_files():
+            total_new += _capture_file(raw_dir, project, path, st)
+    else:
+        for proj in projects:
+            for sess in proj.get("sessions", []):
+                path = str(PROJECTS_DIR / proj["dirName"] / (sess["fullId"] + ".jsonl"))
+                known = _recording_offsets.get(path)
+                if known is not None and sess.get("fileSize", 0) == known[1]:
+                    continue
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                total_new += _capture_file(raw_dir, proj["dirName"], path, st)
+
+    _flush_recording_writers()
+
+    # meta.json is only rewritten when a counter moved; stop writes it too
+    if total_new:
+        _recording_meta["capturedSessions"] = len(_recording_sessions)
+        _recording_meta["capturedEntries"] = (
+            _recording_meta.get("capturedEntries", 0) + total_new
+        )
+        _save_recording_meta(rid, _recording_meta)
 
 
-def capture_sessions_if_active():
+def capture_sessions_if_active(projects: list[dict] | None = None):
     """Called from collect_all() when recording is active."""
     if _recording_active:
-        _do_capture()
+        with _recording_lock, _stage("_do_capture"):
+            _do_capture(projects)
+
 
+def _turn_from_entry(entry: dict) -> dict | None:
+    """Conversation turn for one transcript entry, or None to leave it out."""
+    entry_type = entry.get("type", "")
+    ts = entry.get("timestamp", "")
+    msg = entry.get("message", {})
+    if not isinstance(msg, dict):
+        return None
 
-def generate_documents(rid: str) -> dict:
-    """Parse raw JSONL files and generate conversation.json + conversation.md."""
+    if entry_type == "user":
+        content = msg.get("content", "")
+        text_content = ""
+        if isinstance(content, str):
+            text_content = content.strip()
+        elif isinstance(content, list):
+            for part in content:
+                if isinstance(part, dict) and part.get("type") == "text":
+                    text_content = part.get("text", "").strip()
+                    break
+        if text_content:
+            return {"role": "user", "text": text_content, "timestamp": ts}
+
+    elif entry_type == "assistant":
+        tools, text_out = extract_assistant_content(msg.get("content", ""))
+        turn = {"role": "assistant", "timestamp": ts}
+        if text_out:
+            turn["text"] = text_out
+        if tools:
+            turn["tools"] = tools
+        if text_out or tools:
+            return turn
+    return None
+
+
+def _turn_markdown(turn: dict) -> list[str]:
+    ts = turn.get("timestamp", "")
+    ts_str = f" ({ts})" if ts else ""
+    if turn["role"] == "user":
+        return [f"\n**USER**{ts_str}:\n{turn['text']}\n"]
+    lines = [f"\n**ASSISTANT**{ts_str}:"]
+    if turn.get("text"):
+        lines.append(f"\n{turn['text']}\n")
+    if turn.get("tools"):
+        lines.append(f"\nTools: {', '.join(turn['tools'])}\n")
+    return lines
+
+
+def _json_block(value, depth: int) -> str:
+    """``value`` as it appears nested ``depth`` levels deep in indent=2 JSON."""
+    return json.dumps(value, ensure_ascii=False, indent=2).replace("\n", "\n" + "  " * depth)
+
+
+def generate_documents(rid: str, progress=None) -> dict:
+    """Stream raw JSONL files into conversation.json + conversation.md.
+
+    Turns are written out as they are parsed, so memory stays flat however
+    long the recording is. ``progress(done_bytes, total_bytes)`` is called
+    as raw files are consumed.
+    """
     raw_dir = _recording_dir(rid) / "raw"
     out_dir = _recording_dir(rid) / "output"
     out_dir.mkdir(exist_ok=True)
@@ -945,91 +3119,61 @@ def generate_documents(rid: str) -> dict:
     if not raw_dir.exists():
         return {"error": "no raw data"}
 
-    conversations = []
-    for raw_file in sorted(raw_dir.glob("*.jsonl")):
-        session_id = raw_file.stem
-        turns = []
-        try:
-            text = raw_file.read_text(encoding="utf-8", errors="replace")
-            for line in text.strip().split("\n"):
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    entry = json.loads(line)
-                except json.JSONDecodeError:
-                    continue
-                entry_type = entry.get("type", "")
-                ts = entry.get("timestamp", "")
-                msg = entry.get("message", {})
-                if not isinstance(msg, dict):
-                    continue
-
-                if entry_type == "user":
-                    content = msg.get("content", "")
-                    text_content = ""
-                    if isinstance(content, str):
-                        text_content = content.strip()
-                    elif isinstance(content, list):
-                        for part in content:
-                            if isinstance(part, dict) and part.get("type") == "text":
-                                text_content = part.get("text", "").strip()
-                                break
-                    if text_content:
-                        turns.append({
-                            "role": "user",
-                            "text": text_content,
-                            "timestamp": ts,
-                        })
-
-                elif entry_type == "assistant":
-                    content_str = str(msg.get("content", ""))
-                    tools, text_out = parse_assistant_content(content_str)
-                    turn = {"role": "assistant", "timestamp": ts}
-                    if text_out:
-                        turn["text"] = text_out
-                    if tools:
-                        turn["tools"] = tools
-                    if text_out or tools:
-                        turns.append(turn)
-        except Exception:
-            continue
-
-        if turns:
-            conversations.append({"sessionId": session_id, "turns": turns})
+    if rid == _recording_id:
+        with _recording_lock:
+            _flush_recording_writers(force=True)
+    sessions_raw = raw_sessions(raw_dir)
+    total = sum(fsize(f) for _, paths in sessions_raw for f in paths)
+    done = 0
+    generated_at = datetime.now(tz=timezone.utc).isoformat()
+    json_tmp = out_dir / "conversation.json.tmp"
+    md_tmp = out_dir / "conversation.md.tmp"
+    sessions = 0
+
+    with open(json_tmp, "w", encoding="utf-8") as jf, open(md_tmp, "w", encoding="utf-8") as mf:
+        jf.write("{\n")
+        jf.write(f'  "recordingId": {_json_block(rid, 1)},\n')
+        jf.write(f'  "generatedAt": {_json_block(generated_at, 1)},\n')
+        jf.write('  "sessions": [')
+        mf.write(f"# Recording {rid}\n")
+        mf.write(f"\nGenerated: {generated_at}\n")
+
+        for session_id, paths in sessions_raw:
+            turns = 0
+            try:
+                for line in (ln for p in paths for ln in iter_raw_lines(p)):
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    turn = _turn_from_entry(entry)
+                    if turn is None:
+                        continue
+                    if not turns:
+                        # Sessions without turns are left out, so open lazily
+                        jf.write(",\n    {\n" if sessions else "\n    {\n")
+                        jf.write(f'      "sessionId": {_json_block(session_id, 3)},\n')
+                        jf.write('      "turns": [\n')
+                        mf.write(f"\n\n## Session: {session_id}\n")
+                        sessions += 1
+                    else:
+                        jf.write(",\n")
+                    jf.write("        " + _json_block(turn, 4))
+                    for md in _turn_markdown(turn):
+                        mf.write("\n" + md)
+                    turns += 1
+            except Exception:
+                pass
+            if turns:
+                jf.write("\n      ]\n    }")
+            done += sum(fsize(p) for p in paths)
+            if progress:
+                progress(done, total)
 
-    # Write JSON
-    json_data = {
-        "recordingId": rid,
-        "generatedAt": datetime.now(tz=timezone.utc).isoformat(),
-        "sessions": conversations,
-    }
-    (out_dir / "conversation.json").write_text(
-        json.dumps(json_data, ensure_ascii=False, indent=2), encoding="utf-8"
-    )
+        jf.write("\n  ]\n}" if sessions else "]\n}")
 
-    # Write MD
-    md_lines = [f"# Recording {rid}\n"]
-    md_lines.append(f"Generated: {json_data['generatedAt']}\n")
-    for conv in conversations:
-        md_lines.append(f"\n## Session: {conv['sessionId']}\n")
-        for turn in conv["turns"]:
-            role = turn["role"].upper()
-            ts = turn.get("timestamp", "")
-            ts_str = f" ({ts})" if ts else ""
-            if turn["role"] == "user":
-                md_lines.append(f"\n**USER**{ts_str}:\n{turn['text']}\n")
-            elif turn["role"] == "assistant":
-                md_lines.append(f"\n**ASSISTANT**{ts_str}:")
-                if turn.get("text"):
-                    md_lines.append(f"\n{turn['text']}\n")
-                if turn.get("tools"):
-                    md_lines.append(
-                        f"\nTools: {', '.join(turn['tools'])}\n"
-                    )
-    (out_dir / "conversation.md").write_text(
-        "\n".join(md_lines), encoding="utf-8"
-    )
+    os.replace(json_tmp, out_dir / "conversation.json")
+    os.replace(md_tmp, out_dir / "conversation.md")
 
     # Update meta
     meta = _load_recording_meta(rid) or {}
@@ -1039,7 +3183,7 @@ def generate_documents(rid: str) -> dict:
     return {
         "ok": True,
         "files": ["conversation.json", "conversation.md"],
-        "sessions": len(conversations),
+        "sessions": sessions,
     }
 
 
@@ -1051,32 +3195,148 @@ async def run_claude_cli(prompt: str, input_text: str) -> str:
         stdout=asyncio.subprocess.PIPE,
         stderr=asyncio.subprocess.PIPE,
     )
-    stdout, stderr = await proc.communicate(input=input_text.encode("utf-8"))
+    try:
+        stdout, stderr = await proc.communicate(input=input_text.encode("utf-8"))
+    except asyncio.CancelledError:
+        proc.kill()
+        raise
     if proc.returncode != 0:
         err = stderr.decode("utf-8", errors="replace").strip()
         raise RuntimeError(f"Claude CLI failed: {err}")
     return stdout.decode("utf-8", errors="replace")
 
 
-async def generate_summary(rid: str, custom_prompt: str = "") -> dict:
-    """Generate a phase summary using Claude CLI."""
+# Summaries are map-reduced: the recording is split into chunks at session
+# and turn boundaries, each chunk is summarized by its own CLI call, and
+# the partial summaries are merged. Every call's result is cached under
+# the recording by a hash of prompt and input, so re-summarizing after the
+# recording grew only pays for the chunks that changed.
+
+SUMMARY_CHUNK_CHARS = 60_000
+SUMMARY_CONCURRENCY = max(1, int(os.environ.get("CLAUDE_MONITOR_SUMMARY_WORKERS", "3")))
+_SUMMARY_PROMPT = "请对以下对话记录进行阶段性总结，提取关键决策、完成的任务、遇到的问题和下一步计划。使用中文输出，格式为 Markdown。"
+_CHUNK_PROMPT = "以下是一段较长对话记录中的一个片段。请提取其中的关键决策、完成的任务、遇到的问题和待办事项，尽量简洁。使用中文输出，格式为 Markdown。"
+_MERGE_PROMPT = "以下是同一段对话记录按时间顺序排列的多个分段摘要。请将它们合并为一份摘要，保留关键决策、完成的任务、遇到的问题和待办事项。使用中文输出，格式为 Markdown。"
+_SKILL_PROMPT = "请基于以下总结/对话记录，生成一份标准化的 Claude Code Skill 文档。包含 skill 名称、触发条件、执行步骤和注意事项。使用中文输出，格式为 Markdown。"
+
+
+def summary_chunks(rid: str) -> list[str]:
+    """Conversation Markdown split into chunks that never span sessions.
+
+    A session is cut at turn boundaries once a chunk reaches
+    SUMMARY_CHUNK_CHARS, so appended turns only change its last chunk.
+    """
+    raw_dir = _recording_dir(rid) / "raw"
+    if not raw_dir.exists():
+        return []
+    if rid == _recording_id:
+        with _recording_lock:
+            _flush_recording_writers(force=True)
+    chunks = []
+    for session_id, paths in raw_sessions(raw_dir):
+        header = f"## Session: {session_id}\n"
+        parts, size = [], 0
+        for line in (ln for p in paths for ln in iter_raw_lines(p)):
+            try:
+                turn = _turn_from_entry(json.loads(line))
+            except (json.JSONDecodeError, AttributeError):
+                continue
+            if turn is None:
+                continue
+            md = "\n" + "\n".join(_turn_markdown(turn))[:SUMMARY_CHUNK_CHARS]
+            if parts and size + len(md) > SUMMARY_CHUNK_CHARS:
+                chunks.append(header + "".join(parts))
+                parts, size = [], 0
+            parts.append(md)
+            size += len(md)
+        if parts:
+            chunks.append(header + "".join(parts))
+    return chunks
+
+
+class _SummaryCache:
+    """CLI results of one recording keyed by a hash of prompt and input."""
+
+    def __init__(self, rid: str, kind: str):
+        self.dir = _recording_dir(rid) / "cache" / kind
+        self.used: set[str] = set()
+        self.calls = 0
+
+    async def run(self, prompt: str, text: str, sem: asyncio.Semaphore) -> str:
+        key = hashlib.sha256(f"{prompt}\0{text}".encode("utf-8")).hexdigest()
+        self.used.add(key)
+        path = self.dir / f"{key}.md"
+        try:
+            return path.read_text(encoding="utf-8")
+        except OSError:
+            pass
+        async with sem:
+            result = await run_claude_cli(prompt, text)
+        self.calls += 1
+        self.dir.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(result, encoding="utf-8")
+        os.replace(tmp, path)
+        return result
+
+    def prune(self):
+        """Drop cached results the last run no longer needed."""
+        for f in self.dir.glob("*.md"):
+            if f.stem not in self.used:
+                f.unlink(missing_ok=True)
+
+
+async def generate_summary(rid: str, custom_prompt: str = "", progress=None) -> dict:
+    """Generate a phase summary using Claude CLI, map-reducing long recordings."""
     out_dir = _recording_dir(rid) / "output"
-    md_file = out_dir / "conversation.md"
-    if not md_file.exists():
-        # Generate docs first
-        generate_documents(rid)
-    if not md_file.exists():
+    out_dir.mkdir(exist_ok=True)
+    chunks = await _doc_pool_call(summary_chunks, rid)
+    if not chunks:
         return {"error": "no conversation data"}
 
-    content = md_file.read_text(encoding="utf-8", errors="replace")
-    prompt = custom_prompt or "请对以下对话记录进行阶段性总结，提取关键决策、完成的任务、遇到的问题和下一步计划。使用中文输出，格式为 Markdown。"
-    result = await run_claude_cli(prompt, content)
+    prompt = custom_prompt or _SUMMARY_PROMPT
+    cache = _SummaryCache(rid, "summary")
+    sem = asyncio.Semaphore(SUMMARY_CONCURRENCY)
+    done, total = 0, len(chunks) + (len(chunks) > 1)
+
+    async def step(p: str, text: str) -> str:
+        nonlocal done
+        out = await cache.run(p, text, sem)
+        done += 1
+        if progress:
+            progress(done, total)
+        return out
+
+    async def merge(group: list[str]) -> str:
+        if len(group) == 1:
+            return group[0]
+        return await step(_MERGE_PROMPT, "\n\n---\n\n".join(group))
+
+    if len(chunks) == 1:
+        result = await step(prompt, chunks[0])
+    else:
+        parts = await asyncio.gather(*(step(_CHUNK_PROMPT, c) for c in chunks))
+        # Merge in rounds until the partial summaries fit one call
+        while len(parts) > 1 and sum(len(p) for p in parts) > SUMMARY_CHUNK_CHARS:
+            groups, cur = [], []
+            for part in parts:
+                if cur and sum(len(p) for p in cur) + len(part) > SUMMARY_CHUNK_CHARS:
+                    groups.append(cur)
+                    cur = []
+                cur.append(part)
+            groups.append(cur)
+            if len(groups) == len(parts):
+                break
+            total += sum(len(g) > 1 for g in groups)
+            parts = await asyncio.gather(*(merge(g) for g in groups))
+        result = await step(prompt, "\n\n---\n\n".join(parts))
     (out_dir / "summary.md").write_text(result, encoding="utf-8")
+    cache.prune()
 
     meta = _load_recording_meta(rid) or {}
     meta["hasSummary"] = True
     _save_recording_meta(rid, meta)
-    return {"ok": True, "file": "summary.md"}
+    return {"ok": True, "file": "summary.md", "chunks": len(chunks), "cliCalls": cache.calls}
 
 
 async def generate_skill(rid: str) -> dict:
@@ -1090,9 +3350,10 @@ async def generate_skill(rid: str) -> dict:
         return {"error": "no content to generate skill from"}
 
     content = src.read_text(encoding="utf-8", errors="replace")
-    prompt = "请基于以下总结/对话记录，生成一份标准化的 Claude Code Skill 文档。包含 skill 名称、触发条件、执行步骤和注意事项。使用中文输出，格式为 Markdown。"
-    result = await run_claude_cli(prompt, content)
+    cache = _SummaryCache(rid, "skill")
+    result = await cache.run(_SKILL_PROMPT, content, asyncio.Semaphore(1))
     (out_dir / "skill.md").write_text(result, encoding="utf-8")
+    cache.prune()
 
     meta = _load_recording_meta(rid) or {}
     meta["hasSkill"] = True
@@ -1122,6 +3383,304 @@ def list_recordings() -> list[dict]:
     return recordings
 
 
+# ── Sessions API ──
+
+
+def _parse_since(value: str) -> float | None:
+    """Epoch seconds or an ISO date/time; empty means no bound."""
+    if not value:
+        return 0.0
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+@app.get("/api/sessions")
+def sessions_query(status: str = "", project: str = "", branch: str = "", model: str = "",
+                   sidechain: str = "", since: str = "", sort: str = "mtime",
+                   order: str = "desc", cursor: str = "", limit: int = 50):
+    if sort not in SESSION_SORTS:
+        return {"error": f"sort must be one of: {', '.join(SESSION_SORTS)}"}
+    statuses = {x for x in status.split(",") if x}
+    if statuses - {"active", "recent", "idle"}:
+        return {"error": "status must be active, recent or idle"}
+    since_ts = _parse_since(since)
+    if since_ts is None:
+        return {"error": "invalid since"}
+    position = None
+    if cursor:
+        position = _decode_cursor(cursor, sort)
+        if position is None:
+            return {"error": "invalid cursor"}
+    return _session_index.query(
+        status=statuses, project=project, branch=branch, model=model,
+        sidechain={"true": True, "1": True, "false": False, "0": False}.get(sidechain.lower()),
+        since=since_ts, sort=sort, desc=order != "asc", cursor=position,
+        limit=max(1, min(limit, SESSION_PAGE_MAX)),
+    )
+
+
+@app.get("/api/sessions/{project}/{session}/conversation")
+def session_conversation(project: str, session: str, before: int | None = None,
+                         after: int | None = None, limit: int = 20):
+    if Path(project).name != project or Path(session).name != session:
+        return {"error": "invalid session"}
+    jsonl = PROJECTS_DIR / project / f"{session}.jsonl"
+    try:
+        return get_conversation_page(jsonl, before, limit, after)
+    except OSError:
+        return {"error": "session not found"}
+
+
+# ── Analytics API ──
+
+
+@app.get("/api/analytics/usage")
+def analytics_usage(by: str = "day", since: str = "", until: str = "",
+                    project: str = "", model: str = ""):
+    """Token usage totals from the session catalog, grouped by day/project/model/branch."""
+    return _catalog.usage(by, since, until, project, model)
+
+
+@app.get("/api/analytics/sessions")
+def analytics_sessions(project: str = "", limit: int = 50):
+    return _catalog.sessions(project, max(1, min(limit, 500)))
+
+
+@app.post("/api/analytics/backfill")
+async def analytics_backfill_start(workers: int = 0):
+    """Start a background full-history backfill; progress via GET."""
+    if _backfill.get("state") == "running":
+        return {"error": "backfill already running", **backfill_status()}
+    threading.Thread(
+        target=run_backfill, args=(workers or None,), daemon=True, name="backfill"
+    ).start()
+    return {"ok": True}
+
+
+@app.get("/api/analytics/backfill")
+async def analytics_backfill_status():
+    return backfill_status()
+
+
+# ── Job Scheduler ──
+#
+# Recording jobs (generate, summarize, gen-skill) run on a fixed number of
+# worker tasks fed by a queue. A second request for the same recording and
+# operation (and summary prompt) joins the queued or running job. Job state is kept in
+# jobs.json so finished results survive a restart, finished jobs expire
+# after JOB_TTL_SECS, and every state change and progress update is
+# pushed to /ws subscribers as a {"type": "job"} message.
+
+JOB_WORKERS = 2
+JOB_TTL_SECS = 3600
+JOB_PROGRESS_SECS = 0.5   # min interval between progress pushes per job
+JOBS_FILE = CLAUDE_DIR / "monitor" / "jobs.json"
+_JOB_OPEN = ("queued", "running")
+
+
+class JobCancelled(Exception):
+    """Raised from a progress callback to stop a job running in a thread."""
+
+
+class JobScheduler:
+    def __init__(self):
+        self.jobs: dict[str, dict] = {}          # id -> public job state
+        self._runs: dict[str, object] = {}       # id -> coroutine factory(progress)
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._cancelled: set[str] = set()
+        self._keys: dict[str, str] = {}          # id -> dedup key beyond (rid, op)
+        self._pushed: dict[str, float] = {}      # id -> monotonic time of last push
+        self._sends: set[asyncio.Task] = set()   # in-flight pushes, kept referenced
+        self._queue: asyncio.Queue | None = None
+        self._workers: list[asyncio.Task] = []
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._load()
+
+    def _load(self):
+        data = read_json(JOBS_FILE)
+        if not isinstance(data, dict):
+            return
+        for jid, job in data.items():
+            if not isinstance(job, dict):
+                continue
+            if job.get("status") in _JOB_OPEN:
+                job.update(status="error", error="interrupted by restart",
+                           finishedAt=job.get("finishedAt") or time.time())
+            self.jobs[jid] = job
+        self._prune()
+
+    def _save(self):
+        try:
+            JOBS_FILE.parent.mkdir(parents=True, exist_ok=True)
+            tmp = JOBS_FILE.with_suffix(".tmp")
+            tmp.write_text(json.dumps(self.jobs, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp, JOBS_FILE)
+        except Exception:
+            pass
+
+    def _prune(self) -> bool:
+        cutoff = time.time() - JOB_TTL_SECS
+        expired = [j for j, job in self.jobs.items()
+                   if job.get("status") not in _JOB_OPEN and (job.get("finishedAt") or 0) < cutoff]
+        for jid in expired:
+            del self.jobs[jid]
+            self._pushed.pop(jid, None)
+        return bool(expired)
+
+    def prune(self):
+        """Drop finished jobs past JOB_TTL_SECS and persist if any went."""
+        if self._prune():
+            self._save()
+
+    def _publish(self, job: dict):
+        self._pushed[job["id"]] = time.monotonic()
+        msg, payloads = {"type": "job", "job": job}, {}
+        for client in list(_subscribers):
+            if client.encoding not in payloads:
+                payloads[client.encoding] = _encode(msg, client.encoding)
+            task = asyncio.create_task(client.send(payloads[client.encoding]))
+            self._sends.add(task)
+            task.add_done_callback(self._sends.discard)
+
+    def open_jobs(self) -> list[dict]:
+        return [j for j in self.jobs.values() if j["status"] in _JOB_OPEN]
+
+    def submit(self, rid: str, op: str, run, key: str = "") -> dict:
+        """Queue ``run(progress)`` unless the same (rid, op, key) is already pending."""
+        for job in self.open_jobs():
+            if (job["rid"] == rid and job["op"] == op and job["id"] not in self._cancelled
+                    and self._keys.get(job["id"], "") == key):
+                return job
+        self._prune()
+        if self._queue is None:
+            self._loop = asyncio.get_running_loop()
+            self._queue = asyncio.Queue()
+            self._workers = [asyncio.create_task(self._worker()) for _ in range(JOB_WORKERS)]
+        job = {
+            "id": str(uuid.uuid4())[:8],
+            "rid": rid,
+            "op": op,
+            "status": "queued",
+            "progress": 0.0,
+            "result": None,
+            "error": None,
+            "createdAt": time.time(),
+            "finishedAt": None,
+        }
+        self.jobs[job["id"]] = job
+        self._runs[job["id"]] = run
+        if key:
+            self._keys[job["id"]] = key
+        self._queue.put_nowait(job["id"])
+        self._save()
+        self._publish(job)
+        return job
+
+    def cancel(self, jid: str) -> dict | None:
+        job = self.jobs.get(jid)
+        if job is None or job["status"] not in _JOB_OPEN:
+            return job
+        self._cancelled.add(jid)
+        if job["status"] == "queued":
+            self._finish(job, "cancelled")
+        elif jid in self._tasks:
+            self._tasks[jid].cancel()
+        return job
+
+    def _finish(self, job: dict, status: str, result=None, error: str | None = None):
+        job.update(status=status, result=result, error=error, finishedAt=time.time())
+        if status == "done":
+            job["progress"] = 100.0
+        self._runs.pop(job["id"], None)
+        self._keys.pop(job["id"], None)
+        self._cancelled.discard(job["id"])
+        self._save()
+        self._publish(job)
+
+    def _progress(self, jid: str):
+        """Progress callback for job ``jid``; safe to call from worker threads."""
+        def report(done: int, total: int):
+            if jid in self._cancelled:
+                raise JobCancelled()
+            job = self.jobs.get(jid)
+            if job is None:
+                return
+            job["progress"] = round(100 * done / total, 1) if total else 100.0
+            if time.monotonic() - self._pushed.get(jid, 0) >= JOB_PROGRESS_SECS:
+                self._pushed[jid] = time.monotonic()
+                self._loop.call_soon_threadsafe(self._publish, job)
+        return report
+
+    async def _worker(self):
+        while True:
+            jid = await self._queue.get()
+            job = self.jobs.get(jid)
+            if job is None:
+                continue
+            # A cancelled run of the same recording may still be winding down
+            # in its thread, and a run of the same op (another summary prompt)
+            # writes the same files; start only once those have finished
+            draining = [task for other, task in self._tasks.items()
+                        if self.jobs[other]["rid"] == job["rid"]
+                        and (other in self._cancelled or self.jobs[other]["op"] == job["op"])]
+            if draining:
+                await asyncio.wait(draining)
+            run = self._runs.get(jid)
+            if run is None or job["status"] != "queued":
+                continue
+            job["status"] = "running"
+            self._save()
+            self._publish(job)
+            task = asyncio.create_task(run(self._progress(jid)))
+            self._tasks[jid] = task
+            try:
+                result = await task
+            except (asyncio.CancelledError, JobCancelled):
+                if not task.cancelled() and jid not in self._cancelled:
+                    raise   # the worker itself is shutting down
+                self._finish(job, "cancelled")
+            except Exception as e:
+                self._finish(job, "error", error=str(e))
+            else:
+                self._finish(job, "done", result=result)
+            finally:
+                self._tasks.pop(jid, None)
+
+
+_jobs = JobScheduler()
+
+
+async def _doc_pool_call(fn, *args):
+    """Run ``fn`` on the document pool; when cancelled, return only once the thread has.
+
+    A pool thread cannot be interrupted, so the job stays open with its cancel
+    flag set (which its progress callback turns into JobCancelled) until the
+    thread really stops, and a resubmit never overlaps the old run.
+    """
+    fut = asyncio.get_running_loop().run_in_executor(_doc_pool, fn, *args)
+    try:
+        return await asyncio.shield(fut)
+    except asyncio.CancelledError:
+        try:
+            await fut
+        except Exception:
+            pass
+        raise
+
+
+def _in_doc_pool(fn, *args):
+    """Job body running a blocking document function on the document pool."""
+    async def run(progress):
+        return await _doc_pool_call(fn, *args, progress)
+    return run
+
+
 # ── Recording API Endpoints ──
 
 
@@ -1137,7 +3696,7 @@ async def recording_status():
 
 
 @app.post("/api/recording/start")
-async def recording_start():
+def recording_start():
     if _recording_active:
         return {"error": "already recording", "recordingId": _recording_id}
     rid = start_recording()
@@ -1145,13 +3704,13 @@ async def recording_start():
 
 
 @app.post("/api/recording/stop")
-async def recording_stop():
+def recording_stop():
     result = stop_recording()
     return result
 
 
 @app.get("/api/recording/list")
-async def recording_list():
+def recording_list():
     return list_recordings()
 
 
@@ -1160,7 +3719,8 @@ async def recording_generate(rid: str):
     d = _recording_dir(rid)
     if not d.exists():
         return {"error": "recording not found"}
-    return generate_documents(rid)
+    job = _jobs.submit(rid, "generate", _in_doc_pool(generate_documents, rid))
+    return {"ok": True, "taskId": job["id"], "job": job}
 
 
 @app.post("/api/recording/{rid}/summarize")
@@ -1174,18 +3734,11 @@ async def recording_summarize(rid: str, request: Request):
     except Exception:
         pass
     custom_prompt = body.get("prompt", "")
-    task_id = str(uuid.uuid4())[:8]
-    _async_tasks[task_id] = {"status": "running", "result": None, "error": None}
-
-    async def _run():
-        try:
-            result = await generate_summary(rid, custom_prompt)
-            _async_tasks[task_id] = {"status": "done", "result": result, "error": None}
-        except Exception as e:
-            _async_tasks[task_id] = {"status": "error", "result": None, "error": str(e)}
-
-    asyncio.create_task(_run())
-    return {"ok": True, "taskId": task_id}
+    job = _jobs.submit(
+        rid, "summarize", lambda progress: generate_summary(rid, custom_prompt, progress),
+        key=custom_prompt,
+    )
+    return {"ok": True, "taskId": job["id"], "job": job}
 
 
 @app.post("/api/recording/{rid}/gen-skill")
@@ -1193,18 +3746,8 @@ async def recording_gen_skill(rid: str):
     d = _recording_dir(rid)
     if not d.exists():
         return {"error": "recording not found"}
-    task_id = str(uuid.uuid4())[:8]
-    _async_tasks[task_id] = {"status": "running", "result": None, "error": None}
-
-    async def _run():
-        try:
-            result = await generate_skill(rid)
-            _async_tasks[task_id] = {"status": "done", "result": result, "error": None}
-        except Exception as e:
-            _async_tasks[task_id] = {"status": "error", "result": None, "error": str(e)}
-
-    asyncio.create_task(_run())
-    return {"ok": True, "taskId": task_id}
+    job = _jobs.submit(rid, "gen-skill", lambda progress: generate_skill(rid))
+    return {"ok": True, "taskId": job["id"], "job": job}
 
 
 @app.get("/api/recording/{rid}/files/{filename}")
@@ -1221,10 +3764,25 @@ async def recording_file(rid: str, filename: str):
 
 @app.get("/api/recording/task/{task_id}")
 async def recording_task_status(task_id: str):
-    task = _async_tasks.get(task_id)
-    if not task:
+    _jobs.prune()
+    job = _jobs.jobs.get(task_id)
+    if not job:
+        return {"error": "task not found"}
+    return job
+
+
+@app.post("/api/recording/task/{task_id}/cancel")
+async def recording_task_cancel(task_id: str):
+    job = _jobs.cancel(task_id)
+    if not job:
         return {"error": "task not found"}
-    return task
+    return job
+
+
+@app.get("/api/recording/jobs")
+async def recording_jobs():
+    _jobs.prune()
+    return list(_jobs.jobs.values())
 
 
 MOBILE_UA = re.compile(r"Mobile|Android|iPhone|iPad|iPod|webOS|BlackBerry|Opera Mini|IEMobile", re.I)
@@ -1234,7 +3792,7 @@ MOBILE_UA = re.compile(r"Mobile|Android|iPhone|iPad|iPod|webOS|BlackBerry|Opera
 
 
 @app.get("/api/teams/{team_name}/inbox/{agent_name}")
-async def get_inbox(team_name: str, agent_name: str):
+def get_inbox(team_name: str, agent_name: str):
     inbox_file = TEAMS_DIR / team_name / "inboxes" / f"{agent_name}.json"
     if not inbox_file.exists():
         return []
@@ -1276,6 +3834,100 @@ async def get_inbox(team_name: str, agent_name: str):
     return result
 
 
+_inbox_lock = threading.Lock()   # serializes writers in this process
+
+
+class _InboxDirLock:
+    """Advisory exclusive lock on an inboxes directory (flock on its fd).
+
+    The directory is locked rather than the inbox file because the file
+    itself is replaced on every write. Only this server's own writers take
+    it: agents write their inboxes without it, so an agent write landing
+    between our read and replace can still be lost.
+    """
+
+    def __init__(self, inboxes_dir: Path):
+        self.dir = inboxes_dir
+        self.fd = None
+
+    def __enter__(self):
+        _inbox_lock.acquire()
+        if fcntl is not None:
+            try:
+                self.fd = os.open(self.dir, os.O_RDONLY)
+                fcntl.flock(self.fd, fcntl.LOCK_EX)
+            except OSError:
+                if self.fd is not None:
+                    os.close(self.fd)
+                self.fd = None
+        return self
+
+    def __exit__(self, *exc):
+        if self.fd is not None:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+            os.close(self.fd)
+        _inbox_lock.release()
+
+
+INBOX_SETTLE_SECS = 0.05   # wait before checking our message survived agent writes
+INBOX_WRITE_ATTEMPTS = 5
+
+
+def _inbox_sig(inbox_file: Path):
+    try:
+        st = inbox_file.stat()
+    except OSError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def _write_inbox_once(inbox_file: Path, msg: dict):
+    """One read-append-replace pass; None if the inbox changed under us."""
+    sig = _inbox_sig(inbox_file)
+    data = []
+    if sig is not None:
+        existing = read_json(inbox_file)
+        if isinstance(existing, list):
+            data = existing
+    if msg in data:
+        return data
+    data.append(msg)
+    tmp = inbox_file.with_name(f".{inbox_file.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        tmp.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+        if _inbox_sig(inbox_file) != sig:
+            return None
+        os.replace(tmp, inbox_file)
+    finally:
+        tmp.unlink(missing_ok=True)
+    return data
+
+
+def append_inbox_message(inbox_file: Path, msg: dict) -> list | None:
+    """Append one message to an inbox; returns the inbox as last seen.
+
+    Server writers are serialized by _InboxDirLock. Agents write without
+    it, so the write is skipped and retried if the file changed since it
+    was read, and after a short settle the inbox is re-read and our
+    message merged back in if an agent's write replaced it. An agent
+    write landing between our final check and os.replace can still be
+    lost; that window cannot be closed without a lock agents honour.
+    Returns None if the inbox kept changing and nothing was written.
+    """
+    data = None
+    for _ in range(INBOX_WRITE_ATTEMPTS):
+        with _InboxDirLock(inbox_file.parent):
+            written = _write_inbox_once(inbox_file, msg)
+        if written is None:
+            continue
+        data = written
+        time.sleep(INBOX_SETTLE_SECS)
+        current = read_json(inbox_file)
+        if isinstance(current, list) and msg in current:
+            return current
+    return data
+
+
 @app.post("/api/teams/{team_name}/send")
 async def send_message(team_name: str, request: Request):
     body = await request.json()
@@ -1287,20 +3939,20 @@ async def send_message(team_name: str, request: Request):
     inboxes_dir = TEAMS_DIR / team_name / "inboxes"
     if not inboxes_dir.exists():
         return {"error": f"team '{team_name}' inboxes not found"}
-    inbox_file = inboxes_dir / f"{to}.json"
-    data = []
-    if inbox_file.exists():
-        existing = read_json(inbox_file)
-        if isinstance(existing, list):
-            data = existing
     msg = {
         "from": "human-operator",
         "text": text,
         "summary": summary or text[:80],
         "timestamp": datetime.now(tz=timezone.utc).isoformat(),
     }
-    data.append(msg)
-    inbox_file.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+    data = await asyncio.to_thread(append_inbox_message, inboxes_dir / f"{to}.json", msg)
+    if data is None:
+        return {"error": f"inbox '{to}' kept changing, message not sent"}
+    # Hand the new inbox to the team cache and push it without waiting a tick
+    note_inbox(TEAMS_DIR / team_name, to, data)
+    _schedule.force(["teams"])
+    if _refresh_event is not None:
+        _refresh_event.set()
     return {"ok": True, "message": msg}
 
 
@@ -1317,22 +3969,555 @@ async def mobile():
     return FileResponse(Path(__file__).parent / "mobile.html", media_type="text/html")
 
 
+# ── Delta Protocol ──
+#
+# Each /ws client receives one full snapshot, then keyed patches:
+#   {"type": "snapshot", "v": N, "data": {...}}
+#   {"type": "patch", "v": N, "base": N-1, "ts": ..., "updatedAt": {...}, "ops": [...]}
+#   {"type": "heartbeat", "v": N, "ts": ..., "updatedAt": {...}}   (nothing changed)
+# Like "ts", "updatedAt" rides on every message instead of being diffed, so
+# a refresh that changed nothing still goes out as a heartbeat.
+# Ops are ["set", path, value], ["del", path] and ["order", path, key, [keys]].
+# Path segments are dict keys, or [keyField, keyValue] for items of keyed
+# lists. A client whose version does not match a patch base sends
+# {"type": "resync"} and gets a fresh snapshot.
+
+_MISSING = object()
+
+# Keyed lists are patched item by item; "skip" keys are volatile values the
+# client derives itself (timestamp from "ts", session age from mtime).
+PATCH_SPEC = {
+    "skip": {"timestamp", "updatedAt"},
+    "lists": {
+        "projects": {
+            "key": "dirName",
+            "lists": {"sessions": {"key": "fullId", "skip": {"age"}}},
+        },
+        "teams": {
+            "key": "name",
+            "lists": {"members": {"key": "name"}, "tasks": {"key": "id"}},
+        },
+    },
+}
+
+
+def _diff_dict(old: dict, new: dict, path: list, spec: dict, ops: list):
+    skip = spec.get("skip", ())
+    lists = spec.get("lists", {})
+    for k in old:
+        if k not in new and k not in skip:
+            ops.append(["del", path + [k]])
+    for k, nv in new.items():
+        if k in skip:
+            continue
+        ov = old.get(k, _MISSING)
+        if ov is _MISSING:
+            ops.append(["set", path + [k], nv])
+        elif k in lists and isinstance(ov, list) and isinstance(nv, list):
+            _diff_keyed(ov, nv, path + [k], lists[k], ops)
+        elif isinstance(ov, dict) and isinstance(nv, dict):
+            if ov != nv:
+                _diff_dict(ov, nv, path + [k], {}, ops)
+        elif ov != nv:
+            ops.append(["set", path + [k], nv])
+
+
+def _diff_keyed(old: list, new: list, path: list, spec: dict, ops: list):
+    key = spec["key"]
+    try:
+        old_map = {item[key]: item for item in old}
+        new_map = {item[key]: item for item in new}
+    except (TypeError, KeyError):
+        old_map = new_map = None
+    if old_map is None or len(old_map) != len(old) or len(new_map) != len(new):
+        if old != new:
+            ops.append(["set", path, new])
+        return
+
+    for k in old_map:
+        if k not in new_map:
+            ops.append(["del", path + [[key, k]]])
+    for k, item in new_map.items():
+        prev = old_map.get(k)
+        if prev is None:
+            ops.append(["set", path + [[key, k]], item])
+        else:
+            _diff_dict(prev, item, path + [[key, k]], spec, ops)
+
+    # Client order after the ops above: survivors in old order, then appends
+    expected = [k for k in old_map if k in new_map]
+    expected += [k for k in new_map if k not in old_map]
+    if expected != list(new_map):
+        ops.append(["order", path, key, list(new_map)])
+
+
+def diff_snapshot(old: dict, new: dict) -> list:
+    """Compute patch ops turning snapshot ``old`` into ``new``."""
+    ops = []
+    _diff_dict(old, new, [], PATCH_SPEC, ops)
+    return ops
+
+
+# ── Snapshot Broadcast ──
+#
+# Clients may narrow what they receive, either in the /ws query string or
+# later with a message (both take the same fields):
+#   {"type": "subscribe", "sections": ["teams", "tasks"], "project": "<dirName>",
+#    "interval": 10}
+# "sections" lists SNAPSHOT_SECTIONS entries (omitted: all), "project" limits
+# the project list to one directory, and "interval" asks for at most one
+# update every N seconds, with the ops of skipped ticks folded into it. The
+# collector only computes the union of what current subscribers need.
+#
+# {"type": "refresh", "sections": ["stats"]} (or POST /api/refresh) makes
+# those sections due regardless of their refresh tier and pushes the result
+# right away; "updatedAt" in the data says when each section was refreshed.
+#
+# Each distinct message is serialized once per tick and shared by every
+# client that receives it. "encoding": "msgpack" switches a client to
+# binary MessagePack frames (when msgpack is installed); JSON text frames
+# are compressed with permessage-deflate when the client offers it.
+
+POLL_SECS = REFRESH_TIERS["activeSessions"][0]   # the fastest tier sets the collector tick
+SEND_TIMEOUT_SECS = 10
+WS_DEFLATE = os.environ.get("CLAUDE_MONITOR_WS_DEFLATE", "1") != "0"
+MIN_INTERVAL_SECS = 1.0
+PENDING_OPS_MAX = 2000   # a client held back this long gets a fresh snapshot instead
+_ALWAYS_SENT = {"timestamp", "recording", "skipped", "updatedAt"}
+
+
+class _Client:
+    """One /ws connection; sends are serialized so frames never interleave."""
+
+    def __init__(self, ws: WebSocket):
+        self.ws = ws
+        self.lock = asyncio.Lock()
+        self.sections: frozenset[str] | None = None   # None: every section
+        self.project: str | None = None               # limit "projects" to one dirName
+        self.interval: float | None = None            # None: every tick
+        self.encoding = "json"                        # or "msgpack"
+        self.version = -1          # snapshot version the client holds; -1 wants a snapshot
+        self.seen = -1             # version that ``pending`` brings it up to
+        self.pending: list | None = []   # ops held back until the next send; None: resnapshot
+        self.next_send = 0.0
+
+    def subscribe(self, msg: dict):
+        sections = msg.get("sections")
+        if isinstance(sections, str):
+            sections = sections.split(",")
+        self.sections = (
+            frozenset(x for x in sections if x in SNAPSHOT_SECTIONS)
+            if isinstance(sections, list) else None
+        )
+        project = msg.get("project")
+        self.project = project if isinstance(project, str) and project else None
+        try:
+            interval = float(msg.get("interval") or 0)
+        except (TypeError, ValueError):
+            interval = 0
+        self.interval = max(MIN_INTERVAL_SECS, interval) if interval > 0 else None
+        self.encoding = "msgpack" if msgpack is not None and msg.get("encoding") == "msgpack" else "json"
+        self.version = -1
+
+    @property
+    def view(self) -> tuple:
+        return self.sections, self.project
+
+    async def send(self, payload: str | bytes) -> bool:
+        try:
+            async with self.lock:
+                send = self.ws.send_bytes if isinstance(payload, bytes) else self.ws.send_text
+                with _metrics.timed("ws_send_seconds"):
+                    await asyncio.wait_for(send(payload), SEND_TIMEOUT_SECS)
+            return True
+        except Exception:
+            _metrics.inc("ws_send_failures_total")
+            return False
+
+
+_subscribers: set[_Client] = set()
+_collector_task: asyncio.Task | None = None
+_snapshot: dict | None = None          # private copy of the last broadcast state
+_snapshot_version = 0
+_snapshot_ts = ""
+_snapshot_updated: dict = {}           # updatedAt of the last tick, sent on every message
+_snapshot_payloads: dict[tuple, str | bytes] = {}   # (view, encoding) -> snapshot message this tick
+_snapshot_lock = threading.Lock()      # advanced in the worker thread, read by handlers
+
+
+def _dumps_sized(obj) -> tuple[str, int]:
+    """JSON text and its UTF-8 length, without encoding the text a second time."""
+    if orjson is not None:
+        try:
+            raw = orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+            return raw.decode(), len(raw)
+        except TypeError:
+            pass   # e.g. integers past 64 bits; the stdlib encoder copes
+    text = json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+    return text, len(text) if text.isascii() else len(text.encode())
+
+
+def _dumps(obj) -> str:
+    return _dumps_sized(obj)[0]
+
+
+def _encode_sized(obj, encoding: str = "json") -> tuple[str | bytes, int]:
+    if encoding == "msgpack":
+        payload = msgpack.packb(obj, use_bin_type=True)
+        return payload, len(payload)
+    return _dumps_sized(obj)
+
+
+def _encode(obj, encoding: str = "json") -> str | bytes:
+    return _encode_sized(obj, encoding)[0]
+
+
+def _subscribed_scope() -> tuple[set[str] | None, set[str] | None]:
+    """Union of (sections, project filters) over subscribers; None means all."""
+    sections: set[str] = set()
+    projects: set[str] | None = set()
+    for client in _subscribers:
+        if client.sections is None:
+            return None, None
+        sections |= client.sections
+        if "projects" in client.sections and projects is not None:
+            if client.project is None:
+                projects = None
+            else:
+                projects.add(client.project)
+    return sections, projects
+
+
+def _view_updated(sections: frozenset[str] | None) -> dict:
+    if sections is None:
+        return _snapshot_updated
+    return {k: v for k, v in _snapshot_updated.items() if k in sections}
+
+
+def _view_data(data: dict, view: tuple) -> dict:
+    sections, project = view
+    out = {k: v for k, v in data.items() if sections is None or k in sections or k in _ALWAYS_SENT}
+    if "updatedAt" in out:
+        out["updatedAt"] = _view_updated(sections)
+    if project is not None and "projects" in out:
+        out["projects"] = [p for p in out["projects"] if p.get("dirName") == project]
+    return out
+
+
+def _view_ops(ops: list, view: tuple) -> list:
+    """The ops of a patch that touch what one client subscribed to."""
+    sections, project = view
+    if sections is None and project is None:
+        return ops
+    out = []
+    for op in ops:
+        path = op[1]
+        if sections is not None and path[0] not in sections and path[0] not in _ALWAYS_SENT:
+            continue
+        if project is not None and path[0] == "projects":
+            if len(path) > 1:
+                if path[1] != ["dirName", project]:
+                    continue
+            elif op[0] == "order":
+                op = [op[0], path, op[2], [k for k in op[3] if k == project]]
+            elif op[0] == "set":
+                op = [op[0], path, [p for p in op[2] if p.get("dirName") == project]]
+        out.append(op)
+    return out
+
+
+def _snapshot_message(view: tuple = (None, None), encoding: str = "json") -> tuple[str | bytes, int] | None:
+    with _snapshot_lock:
+        if _snapshot is None:
+            return None
+        return _build_snapshot_message(view, encoding), _snapshot_version
+
+
+def _build_snapshot_message(view: tuple = (None, None), encoding: str = "json") -> str | bytes:
+    """Serialized snapshot for one view, cached until the next tick."""
+    key = (view, encoding)
+    payload = _snapshot_payloads.get(key)
+    _metrics.cache("payload", payload is not None)
+    if payload is None:
+        _snapshot["timestamp"] = _snapshot_ts
+        _snapshot["updatedAt"] = _snapshot_updated
+        data = _snapshot if view == (None, None) else _view_data(_snapshot, view)
+        payload = _snapshot_payloads[key] = _encode_message(
+            {"type": "snapshot", "v": _snapshot_version, "data": data}, encoding
+        )
+    return payload
+
+
+def _encode_message(msg: dict, encoding: str) -> str | bytes:
+    """Encode one /ws message, recording its size and serialization time."""
+    start = time.perf_counter()
+    payload, size = _encode_sized(msg, encoding)
+    _metrics.observe("serialize_seconds", time.perf_counter() - start, type=msg["type"])
+    _metrics.observe("message_bytes", size, SIZE_BUCKETS, type=msg["type"], encoding=encoding)
+    return payload
+
+
+def _collect_tick(sections: set[str] | None, projects: set[str] | None) -> list | None:
+    """Collect and fold one snapshot; runs in a worker thread."""
+    data = collect_all(sections, projects)
+    with _snapshot_lock:
+        return _advance_snapshot(data)
+
+
+def _advance_snapshot(data: dict) -> list | None:
+    """Fold a freshly collected snapshot into the versioned state.
+
+    Returns the patch ops (empty when nothing changed), or None when there
+    was no previous state and every client needs a full snapshot.
+    """
+    global _snapshot, _snapshot_version, _snapshot_ts, _snapshot_updated
+    _snapshot_ts = data.get("timestamp", "")
+    _snapshot_updated = data.get("updatedAt", {})
+    _snapshot_payloads.clear()
+    if _snapshot is None:
+        ops = None
+    else:
+        ops = diff_snapshot(_snapshot, data)
+        if not ops:
+            return ops
+    # Collectors reuse and mutate cached dicts between ticks, so keep a
+    # private deep copy to diff against (marshal round-trips plain JSON data)
+    _snapshot = marshal.loads(marshal.dumps(data))
+    _snapshot_version += 1
+    return ops
+
+
+def _client_message(client: _Client, ops: list | None, now: float, cache: dict) -> str | bytes | None:
+    """Next message for one client after a tick, or None while it is held back.
+
+    Clients with the same view, version and encoding share one serialized message.
+    """
+    version = _snapshot_version
+    base = version - 1 if ops else version
+    if ops is None or client.seen not in (base, version):
+        client.pending = None
+    elif ops and client.seen == base and client.pending is not None:
+        client.pending += _view_ops(ops, client.view)
+        if len(client.pending) > PENDING_OPS_MAX:
+            client.pending = None
+    client.seen = version
+    if client.version >= 0 and client.interval and now < client.next_send:
+        return None
+    client.next_send = now + (client.interval or 0)
+    if client.version < 0 or client.pending is None:
+        payload = _build_snapshot_message(client.view, client.encoding)
+    else:
+        updated = _view_updated(client.sections)
+        if client.version == version:
+            key = ("heartbeat", client.sections, client.encoding)
+            msg = {"type": "heartbeat", "v": version, "ts": _snapshot_ts, "updatedAt": updated}
+        else:
+            key = ("patch", client.view, client.version, client.encoding)
+            msg = {
+                "type": "patch",
+                "v": version,
+                "base": client.version,
+                "ts": _snapshot_ts,
+                "updatedAt": updated,
+                "ops": client.pending,
+            }
+        _metrics.cache("payload", key in cache)
+        if key not in cache:
+            cache[key] = _encode_message(msg, client.encoding)
+        payload = cache[key]
+    client.version = version
+    client.pending = []
+    return payload
+
+
+async def _wait_for_tick(last_tick: float):
+    """Sleep until a subscriber is due an update.
+
+    Clients without an interval get one every POLL_SECS or as soon as the
+    file watcher reports a change; interval clients only when due, so a
+    watcher event alone does not wake the collector for them.
+    """
+    while _subscribers:
+        clients = list(_subscribers)
+        if any(c.version < 0 for c in clients):
+            return
+        now = time.monotonic()
+        deadline = min(c.next_send if c.interval else last_tick + POLL_SECS for c in clients)
+        if now >= deadline:
+            return
+        try:
+            await asyncio.wait_for(_refresh_event.wait(), deadline - now)
+        except asyncio.TimeoutError:
+            return
+        if any(c.interval is None or c.version < 0 for c in _subscribers):
+            return
+        _refresh_event.clear()
+
+
+async def _broadcast_tick():
+    """Collect one tick and send every subscriber what it is due."""
+    # File I/O and parsing stay off the event loop
+    ops = await asyncio.to_thread(_collect_tick, *_subscribed_scope())
+    clients = list(_subscribers)
+    now, cache = time.monotonic(), {}
+    with _snapshot_lock:
+        sends = [(c, _client_message(c, ops, now, cache)) for c in clients]
+    sends = [(c, payload) for c, payload in sends if payload is not None]
+    results = await asyncio.gather(*(c.send(payload) for c, payload in sends))
+    for (client, _), ok in zip(sends, results):
+        if not ok:
+            _subscribers.discard(client)
+    _jobs.prune()
+    await asyncio.to_thread(catalog_sync)
+
+
+async def _collector_loop():
+    """Build one snapshot per tick and fan it out to every /ws subscriber."""
+    global _collector_task, _refresh_event, _snapshot
+    _refresh_event = asyncio.Event()
+    watcher = asyncio.create_task(_watch_loop())
+    try:
+        while _subscribers:
+            _refresh_event.clear()
+            last_tick = time.monotonic()
+            try:
+                await _broadcast_tick()
+            except Exception:
+                # One bad tick must not end the shared loop; clients keep
+                # their state and get the next good tick as a patch
+                _metrics.inc("collect_errors_total")
+                traceback.print_exc()
+            await _wait_for_tick(last_tick)
+    finally:
+        watcher.cancel()
+        _collector_task = None
+        _refresh_event = None
+        with _snapshot_lock:
+            _snapshot = None
+            _snapshot_payloads.clear()
+
+
+def _force_refresh(sections: list[str] | None, clients) -> list[str]:
+    """Refresh ``sections`` (None: all) on the next tick and push it to ``clients`` at once."""
+    forced = _schedule.force(sections)
+    for client in clients:
+        client.next_send = 0.0
+    if _refresh_event is not None:
+        _refresh_event.set()
+    return forced
+
+
+@app.post("/api/refresh")
+async def api_refresh(sections: str = ""):
+    names = [s for s in sections.split(",") if s] or None
+    return {"ok": True, "forced": _force_refresh(names, list(_subscribers))}
+
+
+@app.get("/metrics")
+async def metrics():
+    now = time.time()
+    gauges = {
+        "ws_clients": {(): len(_subscribers)},
+        "source_age_seconds": {
+            (("source", source),): now - ts for source, ts in list(_schedule.updated.items())
+        },
+    }
+    return PlainTextResponse(_metrics.render(gauges), media_type="text/plain; version=0.0.4")
+
+
 @app.websocket("/ws")
 async def websocket_endpoint(ws: WebSocket):
+    global _collector_task
     await ws.accept()
+    client = _Client(ws)
+    if ws.query_params:
+        client.subscribe(dict(ws.query_params))
+    # Late joiners get the current snapshot right away instead of waiting a tick
+    current = await asyncio.to_thread(_snapshot_message, client.view, client.encoding)
+    if current is not None:
+        payload, client.version = current
+        client.seen = client.version
+        client.next_send = time.monotonic() + (client.interval or 0)
+        if not await client.send(payload):
+            return
+    for job in _jobs.open_jobs():
+        await client.send(_encode({"type": "job", "job": job}, client.encoding))
+    _subscribers.add(client)
+    if _collector_task is None:
+        _collector_task = asyncio.create_task(_collector_loop())
+    elif _refresh_event is not None:
+        # The union of subscribed sections may have grown
+        _refresh_event.set()
     try:
         while True:
-            await ws.send_json(collect_all())
-            await asyncio.sleep(3)
+            try:
+                msg = json.loads(await ws.receive_text())
+            except ValueError:
+                continue
+            if not isinstance(msg, dict):
+                continue
+            if msg.get("type") == "resync":
+                client.version = -1
+            elif msg.get("type") == "subscribe":
+                client.subscribe(msg)
+            elif msg.get("type") == "refresh":
+                sections = msg.get("sections")
+                _force_refresh(sections if isinstance(sections, list) else None, [client])
+                continue
+            else:
+                continue
+            # The collector sends the snapshot, keeping it in order with patches
+            if _refresh_event is not None:
+                _refresh_event.set()
     except (WebSocketDisconnect, Exception):
         pass
+    finally:
+        _subscribers.discard(client)
+
+
+def _cli_backfill(workers: int | None):
+    worker = threading.Thread(target=run_backfill, args=(workers,), daemon=True)
+    worker.start()
+    while worker.is_alive():
+        worker.join(1.0)
+        st = backfill_status()
+        if "bytesTotal" in st:
+            print(
+                f"\r  {st['filesDone']}/{st['files']} files  "
+                f"{st['bytesDone'] / 1e6:.1f}/{st['bytesTotal'] / 1e6:.1f} MB  "
+                f"{st['mbPerSec']:.1f} MB/s",
+                end="", flush=True,
+            )
+    st = backfill_status()
+    failed = f" ({st['filesFailed']} files failed)" if st.get("filesFailed") else ""
+    print(f"\n  backfill {st['state']}{failed}" + (f": {st['error']}" if st.get("error") else ""))
 
 
 if __name__ == "__main__":
-    import uvicorn
-
-    _load_timing()
-    print("\n  >> Claude Code Monitor (Enhanced)")
-    print("  Desktop:  http://localhost:5555")
-    print("  Mobile:   http://localhost:5555/m\n")
-    uvicorn.run(app, host="0.0.0.0", port=5555, log_level="warning")
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Claude Code Monitor")
+    sub = parser.add_subparsers(dest="command")
+    bf = sub.add_parser("backfill", help="ingest full session history into the catalog")
+    bf.add_argument("--workers", type=int, default=None)
+    sub.add_parser("migrate-recordings", help="compress raw captures of existing recordings")
+    args = parser.parse_args()
+
+    if args.command == "backfill":
+        _cli_backfill(args.workers)
+    elif args.command == "migrate-recordings":
+        for res in migrate_recordings():
+            if res["converted"]:
+                print(
+                    f"  {res['id']}: {res['converted']} files  "
+                    f"{res['bytesBefore'] / 1e6:.1f} MB -> {res['bytesAfter'] / 1e6:.1f} MB"
+                )
+    else:
+        import uvicorn
+
+        _load_timing()
+        print("\n  >> Claude Code Monitor (Enhanced)")
+        print("  Desktop:  http://localhost:5555")
+        print("  Mobile:   http://localhost:5555/m\n")
+        uvicorn.run(app, host="0.0.0.0", port=5555, log_level="warning",
+                    ws_per_message_deflate=WS_DEFLATE)